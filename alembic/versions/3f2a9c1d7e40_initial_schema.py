@@ -0,0 +1,102 @@
+"""initial schema
+
+Revision ID: 3f2a9c1d7e40
+Revises: 
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '3f2a9c1d7e40'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('keyword_summaries',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('date', sa.DateTime(), nullable=False),
+    sa.Column('keywords', sa.JSON(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('date')
+    )
+    op.create_table('press',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('logo_img_src', sa.String(length=120), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    op.create_table('authors',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('author_key', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('press_id', sa.String(), nullable=False),
+    sa.ForeignKeyConstraint(['press_id'], ['press.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('articles',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('title', sa.String(length=255), nullable=False),
+    sa.Column('url', sa.String(length=255), nullable=False),
+    sa.Column('content', sa.String(), nullable=False),
+    sa.Column('published_at', sa.DateTime(), nullable=False),
+    sa.Column('edited_at', sa.DateTime(), nullable=True),
+    sa.Column('narrative_summary', sa.String(), nullable=True),
+    sa.Column('image', sa.LargeBinary(), nullable=True),
+    sa.Column('image_text', sa.String(), nullable=True),
+    sa.Column('ranking', sa.Integer(), nullable=False),
+    sa.Column('activity_score', sa.Float(), nullable=False),
+    sa.Column('genre', sa.String(), nullable=False),
+    sa.Column('author_id', sa.String(), nullable=False),
+    sa.Column('press_id', sa.String(), nullable=False),
+    sa.Column('media_bias', sa.String(length=10), nullable=True),
+    sa.Column('reporting_bias', sa.String(length=10), nullable=True),
+    sa.ForeignKeyConstraint(['author_id'], ['authors.id'], ),
+    sa.ForeignKeyConstraint(['press_id'], ['press.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('url')
+    )
+    op.create_table('highlighted_articles',
+    sa.Column('article_id', sa.UUID(), nullable=False),
+    sa.Column('highlighted_text', sa.Text(), nullable=False),
+    sa.ForeignKeyConstraint(['article_id'], ['articles.id'], ),
+    sa.PrimaryKeyConstraint('article_id')
+    )
+    op.create_table('newschat',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('article_id', sa.UUID(), nullable=False),
+    sa.Column('speaker', sa.Integer(), nullable=False),
+    sa.Column('speaker_name', sa.String(length=50), nullable=False),
+    sa.Column('content', sa.String(length=200), nullable=False),
+    sa.Column('order', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['article_id'], ['articles.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('article_id', 'order', name='uq_newschat_article_order')
+    )
+    op.create_table('story_summary',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('article_id', sa.UUID(), nullable=False),
+    sa.Column('story', sa.String(), nullable=False),
+    sa.Column('dictionary', sa.JSON(), nullable=False),
+    sa.ForeignKeyConstraint(['article_id'], ['articles.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('story_summary')
+    op.drop_table('newschat')
+    op.drop_table('highlighted_articles')
+    op.drop_table('articles')
+    op.drop_table('authors')
+    op.drop_table('press')
+    op.drop_table('keyword_summaries')
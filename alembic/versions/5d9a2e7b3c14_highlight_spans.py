@@ -0,0 +1,32 @@
+"""highlight spans
+
+Revision ID: 5d9a2e7b3c14
+Revises: c7e41b9d2f08
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d9a2e7b3c14'
+down_revision: Union[str, None] = 'c7e41b9d2f08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('highlighted_articles', sa.Column('spans', sa.JSON(), nullable=True))
+    op.alter_column('highlighted_articles', 'highlighted_text', existing_type=sa.Text(), nullable=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Span-only rows have no marked-up copy to fall back to
+    op.execute("DELETE FROM highlighted_articles WHERE highlighted_text IS NULL")
+    op.alter_column('highlighted_articles', 'highlighted_text', existing_type=sa.Text(), nullable=False)
+    op.drop_column('highlighted_articles', 'spans')
@@ -0,0 +1,47 @@
+"""query indexes
+
+Revision ID: 8b5d0e6a4c21
+Revises: 3f2a9c1d7e40
+Create Date: 2026-10-18 10:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b5d0e6a4c21'
+down_revision: Union[str, None] = '3f2a9c1d7e40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Activity-ranked feeds (global and per genre), keyset on (activity_score, id)
+    op.create_index('ix_articles_activity_score_id', 'articles', [sa.text('activity_score DESC'), sa.text('id DESC')], unique=False)
+    op.create_index('ix_articles_genre_activity_score_id', 'articles', ['genre', sa.text('activity_score DESC'), sa.text('id DESC')], unique=False)
+
+    # Foreign keys used in joins and per-article lookups.
+    # newschat.article_id is already covered by uq_newschat_article_order.
+    op.create_index('ix_articles_author_id', 'articles', ['author_id'], unique=False)
+    op.create_index('ix_articles_press_id', 'articles', ['press_id'], unique=False)
+    op.create_index('ix_authors_press_id', 'authors', ['press_id'], unique=False)
+    op.create_index('ix_story_summary_article_id', 'story_summary', ['article_id'], unique=False)
+
+    # Substring (ILIKE '%kw%') search on titles
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index('ix_articles_title_trgm', 'articles', ['title'], unique=False, postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_articles_title_trgm', table_name='articles', postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'})
+    op.drop_index('ix_story_summary_article_id', table_name='story_summary')
+    op.drop_index('ix_authors_press_id', table_name='authors')
+    op.drop_index('ix_articles_press_id', table_name='articles')
+    op.drop_index('ix_articles_author_id', table_name='articles')
+    op.drop_index('ix_articles_genre_activity_score_id', table_name='articles')
+    op.drop_index('ix_articles_activity_score_id', table_name='articles')
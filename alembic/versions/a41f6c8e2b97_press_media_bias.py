@@ -0,0 +1,28 @@
+"""press media bias
+
+Revision ID: a41f6c8e2b97
+Revises: 5d9a2e7b3c14
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a41f6c8e2b97'
+down_revision: Union[str, None] = '5d9a2e7b3c14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('press', sa.Column('media_bias', sa.String(length=10), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('press', 'media_bias')
@@ -0,0 +1,36 @@
+"""keyword summary buckets
+
+Revision ID: c7e41b9d2f08
+Revises: 8b5d0e6a4c21
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e41b9d2f08'
+down_revision: Union[str, None] = '8b5d0e6a4c21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('keyword_summaries', sa.Column('granularity', sa.String(length=10), server_default='daily', nullable=False))
+    op.drop_constraint('keyword_summaries_date_key', 'keyword_summaries', type_='unique')
+    op.create_unique_constraint('uq_keyword_summaries_date_granularity', 'keyword_summaries', ['date', 'granularity'])
+    # Time-windowed keyword summaries select articles by publication time
+    op.create_index('ix_articles_published_at', 'articles', ['published_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_articles_published_at', table_name='articles')
+    op.drop_constraint('uq_keyword_summaries_date_granularity', 'keyword_summaries', type_='unique')
+    op.execute("DELETE FROM keyword_summaries WHERE granularity <> 'daily'")
+    op.create_unique_constraint('keyword_summaries_date_key', 'keyword_summaries', ['date'])
+    op.drop_column('keyword_summaries', 'granularity')
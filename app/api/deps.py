@@ -9,7 +9,9 @@ from app.core.db import engine
 
 # Get current session
 def get_db() -> Generator[Session, None, None]:
-    with Session(engine) as session:
+    # Async routes commit from worker threads, keep the loaded attributes
+    # instead of reloading them on the event loop
+    with Session(engine, expire_on_commit=False) as session:
         yield session
 
 
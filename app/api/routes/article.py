@@ -1,115 +1,282 @@
-from fastapi import FastAPI, APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
-from app.models import Article, Author, Press, NewsChat
-from app.models.response import ArticleResponse
+from fastapi import APIRouter, HTTPException, Query, Request
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session, joinedload, selectinload
+from app.models import Article, Author, Press
+from app.models.response import ArticleResponse, ArticleListResponse, ArticlePageResponse, NewsChatResponse
+from fastapi.responses import StreamingResponse
+from app.core.util import encode_cursor, decode_cursor
 import uuid
+import asyncio
 from app.api.deps import SessionDep
-from sqlalchemy import select
+from sqlalchemy import select, tuple_, func
 import json
-from app.core.db import create_news_chat, create_keyword_summary, create_highlighted_article, update_article_bias, create_summary
-from typing import List
-from fastapi import Body
+from app.core.db import create_article_assets, stream_news_chat, create_keyword_summary, create_highlighted_article, update_article_bias, KEYWORD_WINDOW_HOURS, KEYWORD_GRANULARITY, API_KEY
+from app.util.llm_client import get_llm_client
+from app.util.highlight import render_highlight
+from app.core.pregen import progress as pregen_progress, bias_progress, start_bias_precompute
+from app.core.cache import cached_response
+from typing import Literal
 from enum import Enum
 
 router = APIRouter(prefix="/article", tags=["article"])
 
+article_list_adapter = TypeAdapter(list[ArticleListResponse])
+
+# Characters of content shown in feed items
+EXCERPT_LENGTH = 120
+
+# Column-projected feed query, no article bodies or detail relations
+def article_list_statement():
+    return (
+        select(
+            Article.id,
+            Article.title,
+            Article.url,
+            Article.published_at,
+            Article.genre,
+            Article.activity_score,
+            Article.ranking,
+            func.substr(Article.content, 1, EXCERPT_LENGTH).label("excerpt"),
+            Author.id.label("author_id"),
+            Author.name.label("author_name"),
+            Press.id.label("press_id"),
+            Press.name.label("press_name"),
+            Press.logo_img_src,
+        )
+        .join(Author, Article.author_id == Author.id)
+        .join(Press, Author.press_id == Press.id)
+    )
+
+def article_list_items(rows) -> list[ArticleListResponse]:
+    return [
+        ArticleListResponse(
+            id=row.id,
+            title=row.title,
+            url=row.url,
+            published_at=row.published_at,
+            genre=row.genre,
+            activity_score=row.activity_score,
+            ranking=row.ranking,
+            excerpt=row.excerpt,
+            author={
+                "id": row.author_id,
+                "name": row.author_name,
+                "press": {
+                    "id": row.press_id,
+                    "name": row.press_name,
+                    "logo_img_src": row.logo_img_src,
+                },
+            },
+        )
+        for row in rows
+    ]
+
 # Get articles in batches of 10
-@router.get("/page{page}", response_model=list[ArticleResponse])
-def get_articles(page: int, db: SessionDep):
+@router.get("/page{page}", response_model=list[ArticleListResponse])
+def get_articles(page: int, request: Request, db: SessionDep):
     """
     Get article by id
     """
     page -= 1
     if page < 0 or page > 3:
         raise HTTPException(status_code=400, detail="Page must be between 1 and 4")
-    articles = db.query(Article).options(
-        joinedload(Article.author).joinedload(Author.press)
-    ).order_by(Article.activity_score.desc()).offset(page * 10).limit(10).all()
 
-    for article in articles:
-        print(article)
+    def build() -> bytes:
+        rows = db.execute(
+            article_list_statement()
+            .order_by(Article.activity_score.desc())
+            .offset(page * 10)
+            .limit(10)
+        ).all()
+
+        return article_list_adapter.dump_json(article_list_items(rows))
+
+    return cached_response(request, build)
+
+# Build one keyset page of the activity-ranked feed
+def build_article_feed_page(db: Session, cursor: str | None, limit: int, genre: str | None = None) -> bytes:
+    """
+    Fetch the `limit` articles after `cursor`, ordered by (activity_score, id) descending.
+    """
+    statement = (
+        article_list_statement()
+        .order_by(Article.activity_score.desc(), Article.id.desc())
+        .limit(limit + 1)
+    )
+
+    if genre is not None:
+        statement = statement.where(Article.genre == genre)
+
+    if cursor:
+        try:
+            activity_score, last_id = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        statement = statement.where(
+            tuple_(Article.activity_score, Article.id) < tuple_(activity_score, last_id)
+        )
+
+    rows = db.execute(statement).all()
 
-    return articles
+    # 404 like /genre/{genre}, a cursor past the last page still gets an empty page
+    if genre is not None and not cursor and not rows:
+        raise HTTPException(status_code=404, detail="No articles found for this genre")
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].activity_score, rows[-1].id)
+
+    page = ArticlePageResponse(
+        items=article_list_items(rows),
+        next_cursor=next_cursor
+    )
+    return page.model_dump_json().encode()
+
+# Get articles by cursor
+@router.get("/feed", response_model=ArticlePageResponse)
+def get_article_feed(request: Request, db: SessionDep, cursor: str | None = None, limit: int = Query(10, ge=1, le=50)):
+    """
+    Get the activity-ranked feed, one keyset page at a time
+    """
+    return cached_response(request, lambda: build_article_feed_page(db, cursor, limit))
 
 # Fetch article with narrative and talk format
 @router.get("/view/{id}", response_model=ArticleResponse)
-def get_article_summary(id: uuid.UUID, session: SessionDep):
+async def get_article_summary(id: uuid.UUID, session: SessionDep):
     """
     Get article summary by id
     """
     retrieve_statement = (
         select(Article)
+        .options(
+            joinedload(Article.author).joinedload(Author.press),
+            selectinload(Article.chat_lines),
+            selectinload(Article.story_summary)
+        )
         .where(Article.id == id)
     )
 
-    article = session.execute(retrieve_statement).scalars().first()
+    def load() -> Article | None:
+        article = session.execute(retrieve_statement).scalars().first()
+        # Hand the connection back before waiting on generation, other
+        # requests may hold the rest of the pool meanwhile
+        session.commit()
+        return article
+
+    # The session blocks, keep it off the event loop
+    article = await asyncio.to_thread(load)
 
     if not article:
         raise HTTPException(status_code=404, detail="Article not found")
-    
-    retrieve_statement = (
-        select(NewsChat)
-        .where(NewsChat.article_id == id)
-    )
-
-    chat_lines = session.execute(retrieve_statement).scalars().all()
 
-    if not chat_lines:
-        print("generating summary")
-        create_news_chat(article, session)
-        session.refresh(article)
-    else:
-        print("summary found!")
+    if not article.chat_lines or not article.story_summary:
+        await create_article_assets(article, session)
 
-    if not article.story_summary:
-        print("generating story summary")
-        create_summary(article, session)    
-        session.refresh(article)
     try:
-        return article
+        # Off the loop, a failed commit leaves the article to be reloaded lazily
+        return await asyncio.to_thread(ArticleResponse.model_validate, article, from_attributes=True)
     except Exception as e:
-        print("!!!!!!")
         print(f"Error retrieving article summary: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+# Stream news chat lines over server-sent events
+@router.get("/view/{id}/chat/stream")
+async def stream_article_chat(id: uuid.UUID, session: SessionDep):
+    """
+    Stream chat lines as they are generated (text/event-stream)
+    """
+    def exists() -> bool:
+        found = session.get(Article, id) is not None
+        # The stream uses its own sessions, hand this connection back meanwhile
+        session.commit()
+        return found
+
+    if not await asyncio.to_thread(exists):
+        raise HTTPException(status_code=404, detail="Article not found")
+
+    async def events():
+        try:
+            async for chat_line in stream_news_chat(id):
+                line = NewsChatResponse.model_validate(chat_line, from_attributes=True)
+                yield f"data: {line.model_dump_json()}\n\n"
+        except Exception as e:
+            print(f"Error streaming news chat: {e}")
+            yield f"event: error\ndata: {json.dumps({'detail': str(e)}, ensure_ascii=False)}\n\n"
+            return
+        yield "event: done\ndata: {}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # 오늘의 키워드
 @router.post("/keywords")
-def get_today_keywords(session: SessionDep):
+async def get_today_keywords(session: SessionDep, window_hours: int = Query(KEYWORD_WINDOW_HOURS, ge=1, le=24 * 7), granularity: Literal["hourly", "daily"] = KEYWORD_GRANULARITY):
     try:
-        result = create_keyword_summary(session)
+        result = await create_keyword_summary(session, window_hours, granularity)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Keyword generation failed: {e}")
     return result
 
 # 집중 읽기 모드
 @router.get("/highlight/{id}")
-def get_highlighted_article(id: uuid.UUID, session: SessionDep):
-    article = session.query(Article).filter(Article.id == id).first()
+async def get_highlighted_article(id: uuid.UUID, session: SessionDep, format: Literal["markup", "spans"] = "markup"):
+    article = await asyncio.to_thread(lambda: session.query(Article).filter(Article.id == id).first())
     if not article:
         raise HTTPException(status_code=404, detail="Article not found")
     
     try:
-        highlighted = create_highlighted_article(article, session)
+        highlight = await create_highlighted_article(article, session)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Highlight generation failed: {e}")
-    
-    return {"highlighted": highlighted}
+
+    # Rows stored before spans only have the marked-up copy
+    if highlight["spans"] is None:
+        return {"highlighted": highlight["highlighted_text"]}
+
+    if format == "spans":
+        return {"spans": highlight["spans"]}
+
+    return {"highlighted": render_highlight(article.content, highlight["spans"]), "spans": highlight["spans"]}
+
+# 정치 기사 편향 일괄 계산
+@router.post("/bias/precompute")
+async def post_bias_precompute(concurrency: int = Query(4, ge=1, le=16)):
+    start_bias_precompute(concurrency)
+    return bias_progress
+
+@router.get("/bias/precompute")
+def get_bias_precompute_progress():
+    return bias_progress
 
 # 편향
 @router.get("/bias/{id}")
-def get_article_bias(id: uuid.UUID, session: SessionDep):
-    article = session.query(Article).filter(Article.id == id).first()
+async def get_article_bias(id: uuid.UUID, session: SessionDep):
+    article = await asyncio.to_thread(lambda: session.query(Article).filter(Article.id == id).first())
 
     if not article:
         raise HTTPException(status_code=404, detail="Article not found")
 
     try:
-        result = update_article_bias(article, session)
+        result = await update_article_bias(article, session)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Bias detection failed: {e}")
 
     return result
 
+# 사전 생성 진행 상황
+@router.get("/pregen")
+def get_pregen_progress():
+    return pregen_progress
+
+# LLM 요청 대기열 상태
+@router.get("/llm")
+def get_llm_stats():
+    return get_llm_client(API_KEY).snapshot()
+
 class Genre(str, Enum):
     LIVING = "생활"
     POLITICS = "정치"
@@ -121,16 +288,37 @@ class Genre(str, Enum):
     SOCIETY = "사회"
 
 # Fetch article by genre
-@router.get("/genre/{genre}", response_model=list[ArticleResponse])
-def get_articles_by_genre(genre: Genre, db: SessionDep):
+@router.get("/genre/{genre}", response_model=list[ArticleListResponse])
+def get_articles_by_genre(genre: Genre, request: Request, db: SessionDep):
     """
     Get articles by genre
     """
     if genre == Genre.EDITORIAL:
         genre = Genre.EDITORIAL2
-    articles = db.query(Article).filter(Article.genre == genre).order_by(Article.activity_score.desc()).limit(10).all()
 
-    if not articles:
-        raise HTTPException(status_code=404, detail="No articles found for this genre")
-    
-    return articles
+    def build() -> bytes:
+        rows = db.execute(
+            article_list_statement()
+            .where(Article.genre == genre)
+            .order_by(Article.activity_score.desc())
+            .limit(10)
+        ).all()
+
+        if not rows:
+            raise HTTPException(status_code=404, detail="No articles found for this genre")
+
+        return article_list_adapter.dump_json(article_list_items(rows))
+
+    return cached_response(request, build)
+
+# Fetch article by genre, by cursor
+@router.get("/genre/{genre}/feed", response_model=ArticlePageResponse)
+def get_article_feed_by_genre(genre: Genre, request: Request, db: SessionDep, cursor: str | None = None, limit: int = Query(10, ge=1, le=50)):
+    """
+    Get the activity-ranked feed of a genre, one keyset page at a time.
+    404 when the genre has no articles, an empty page past its last one
+    """
+    if genre == Genre.EDITORIAL:
+        genre = Genre.EDITORIAL2
+
+    return cached_response(request, lambda: build_article_feed_page(db, cursor, limit, genre.value))
@@ -0,0 +1,389 @@
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import time
+import uuid
+from typing import Iterable, List
+
+from sqlalchemy.orm import Session, joinedload
+
+from app.core.db import engine, create_press_bias, API_KEY
+from app.models import Article, Press, NewsChat, StorySummary, HighlightedArticle
+from app.util.AI import (
+    MODEL, PROMPT_VERSIONS,
+    chat_chunk_messages, narrative_messages, highlight_chunk_messages, bias_messages,
+    parse_chat, parse_narrative, parse_highlight, parse_bias, merge_chat_lines,
+)
+from app.util.highlight import merge_spans
+from app.util.llm_cache import llm_cache
+from app.util.llm_client import close_llm_clients
+
+# Batch settings
+BATCH_BACKEND = os.getenv("BATCH_BACKEND", "local").lower()
+BATCH_DIR = os.getenv("BATCH_DIR", "batches")
+
+BATCH_ASSETS = ("chat", "narrative", "highlight", "bias")
+
+# Request options matching the interactive calls
+ASSET_OPTIONS = {"highlight": {"response_format": {"type": "json_object"}}}
+
+
+# Prompts of one (article, asset), one per chunk of a long article like the interactive calls
+def asset_requests(article: Article, kind: str) -> List[list]:
+    if kind == "chat":
+        return chat_chunk_messages(article)
+    if kind == "narrative":
+        return [narrative_messages(article)]
+    if kind == "highlight":
+        return highlight_chunk_messages(article)
+    if kind == "bias":
+        if article.press.media_bias is None:
+            raise ValueError(f"Press bias of {article.press.name} is not resolved")
+        return [bias_messages(article.press.name, article.press.media_bias, article.content)]
+    raise ValueError(f"Unknown asset kind: {kind}")
+
+
+def asset_cache_key(kind: str, messages: list) -> str:
+    return llm_cache.key(kind, PROMPT_VERSIONS[kind], MODEL, messages)
+
+
+# custom_id of one request, chunks of a long article are numbered
+def request_id(article: Article, kind: str, index: int, chunks: int) -> str:
+    return f"{kind}:{article.id}:{index}" if chunks > 1 else f"{kind}:{article.id}"
+
+
+# Completions of every chunk of the asset from the LLM cache, None while one is missing
+def cached_contents(article: Article, kind: str) -> List[str] | None:
+    contents = [llm_cache.get(asset_cache_key(kind, messages)) for messages in asset_requests(article, kind)]
+    return None if any(content is None for content in contents) else contents
+
+
+# Articles still missing each asset
+def missing_assets(session: Session, assets: Iterable[str]) -> List[tuple[Article, str]]:
+    articles = session.query(Article).options(joinedload(Article.press)).order_by(Article.activity_score.desc()).all()
+
+    existing = {
+        "chat": {row[0] for row in session.query(NewsChat.article_id).distinct()},
+        "narrative": {row[0] for row in session.query(StorySummary.article_id).distinct()},
+        "highlight": {row[0] for row in session.query(HighlightedArticle.article_id)},
+        "bias": {article.id for article in articles if article.media_bias is not None and article.reporting_bias is not None},
+    }
+
+    jobs = []
+    for article in articles:
+        for kind in assets:
+            if kind == "bias" and article.genre != "정치":
+                continue
+            if article.id in existing[kind]:
+                continue
+            jobs.append((article, kind))
+    return jobs
+
+
+# Resolve the leaning of every press with 정치 articles missing bias
+def resolve_press_biases(session: Session) -> None:
+    """
+    Reporting-bias prompts embed the press leaning, so it is judged with
+    interactive calls (one per press) before the batch is written.
+    """
+    presses = (
+        session.query(Press)
+        .join(Article, Article.press_id == Press.id)
+        .filter(Article.genre == "정치", Press.media_bias.is_(None))
+        .distinct()
+        .all()
+    )
+    if not presses:
+        return
+
+    # Resolved concurrently, each on its own session since create_press_bias
+    # runs its queries in worker threads
+    async def resolve_press(press_id: str) -> str:
+        with Session(engine, expire_on_commit=False) as press_session:
+            return await create_press_bias(press_session.get(Press, press_id), press_session)
+
+    async def resolve() -> None:
+        results = await asyncio.gather(*(resolve_press(press.id) for press in presses), return_exceptions=True)
+        for press, result in zip(presses, results):
+            if isinstance(result, Exception):
+                print(f"[BATCH] 언론사 성향 판단 실패 ({press.name}): {result}")
+        # Closed before asyncio.run closes this loop
+        await close_llm_clients()
+
+    asyncio.run(resolve())
+    # Stored by the other sessions
+    session.expire_all()
+
+
+# Write one chat-completions request per (article, asset, chunk)
+def write_batch_requests(session: Session, path: str, assets: Iterable[str] = BATCH_ASSETS) -> int:
+    """
+    Write OpenAI batch-format requests for every missing asset to path.
+    Chunks already in the LLM cache are skipped, load them with `load --from-cache`.
+    """
+    if "bias" in assets:
+        resolve_press_biases(session)
+
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for article, kind in missing_assets(session, assets):
+            if kind == "bias" and article.press.media_bias is None:
+                continue
+            requests = asset_requests(article, kind)
+            for index, messages in enumerate(requests):
+                if llm_cache.get(asset_cache_key(kind, messages)) is not None:
+                    continue
+                f.write(json.dumps({
+                    "custom_id": request_id(article, kind, index, len(requests)),
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": {"model": MODEL, "messages": messages, **ASSET_OPTIONS.get(kind, {})},
+                }, ensure_ascii=False) + "\n")
+                count += 1
+
+    print(f"[BATCH] {count}개 요청 작성: {path}")
+    return count
+
+
+class LocalFileBackend:
+    """
+    File-based stand-in for a batch API.
+
+    submit() copies the requests to <directory>/<batch_id>/input.jsonl. The
+    batch completes once <directory>/<batch_id>/output.jsonl exists, written
+    in the OpenAI batch output format by whatever fulfils it.
+    """
+
+    def __init__(self, directory: str = BATCH_DIR):
+        self.directory = directory
+
+    def submit(self, path: str) -> str:
+        batch_id = f"batch_{uuid.uuid4().hex[:12]}"
+        os.makedirs(os.path.join(self.directory, batch_id), exist_ok=True)
+        shutil.copyfile(path, os.path.join(self.directory, batch_id, "input.jsonl"))
+        return batch_id
+
+    def status(self, batch_id: str) -> str:
+        if os.path.exists(os.path.join(self.directory, batch_id, "output.jsonl")):
+            return "completed"
+        return "in_progress"
+
+    def results(self, batch_id: str) -> List[dict]:
+        with open(os.path.join(self.directory, batch_id, "output.jsonl"), encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+
+class OpenAIBatchBackend:
+    """
+    OpenAI Batch API (/v1/batches) backend.
+    """
+
+    def __init__(self, api_key: str | None = API_KEY):
+        from openai import OpenAI
+        self.client = OpenAI(api_key=api_key, base_url=os.getenv("OPENAI_BASE_URL") or None)
+
+    def submit(self, path: str) -> str:
+        with open(path, "rb") as f:
+            input_file = self.client.files.create(file=f, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        return batch.id
+
+    def status(self, batch_id: str) -> str:
+        return self.client.batches.retrieve(batch_id).status
+
+    def results(self, batch_id: str) -> List[dict]:
+        batch = self.client.batches.retrieve(batch_id)
+        if not batch.output_file_id:
+            return []
+        content = self.client.files.content(batch.output_file_id).text
+        return [json.loads(line) for line in content.splitlines() if line.strip()]
+
+
+def get_backend(name: str = BATCH_BACKEND):
+    if name == "local":
+        return LocalFileBackend()
+    if name == "openai":
+        return OpenAIBatchBackend()
+    raise ValueError(f"Unknown batch backend: {name}")
+
+
+# Parse the completion of one request
+def parse_asset(article: Article, kind: str, content: str):
+    if kind == "chat":
+        return parse_chat(article, content)
+    if kind == "narrative":
+        return parse_narrative(article, content)
+    if kind == "highlight":
+        return parse_highlight(article, content)
+    return parse_bias(content)
+
+
+# Apply the completions of every chunk to the article, merged as in the interactive calls
+def apply_asset(session: Session, article: Article, kind: str, contents: List[str]) -> bool:
+    results = [parse_asset(article, kind, content) for content in contents]
+    if not all(results):
+        return False
+
+    if kind == "chat":
+        session.add_all(results[0] if len(results) == 1 else merge_chat_lines(results))
+    elif kind == "narrative":
+        session.add(results[0])
+    elif kind == "highlight":
+        spans = results[0] if len(results) == 1 else merge_spans(span for spans in results for span in spans)
+        session.add(HighlightedArticle(article_id=article.id, spans=spans))
+    elif kind == "bias":
+        article.media_bias = article.press.media_bias
+        article.reporting_bias = results[0]["reporting_bias"]
+    return True
+
+
+# Bulk-load batch results into the asset tables
+def load_batch_results(session: Session, results: List[dict]) -> dict:
+    """
+    Seed the LLM cache with every result that parses, so the interactive
+    paths reuse it, then store each asset whose chunks are all cached.
+    Assets that already exist are left untouched, assets still missing a
+    chunk are counted as incomplete.
+    """
+    pending = {(article.id, kind) for article, kind in missing_assets(session, BATCH_ASSETS)}
+    articles = {article.id: article for article in session.query(Article).options(joinedload(Article.press))}
+
+    summary = {"loaded": 0, "skipped": 0, "failed": 0, "incomplete": 0}
+    answered = {}
+    for result in results:
+        try:
+            kind, article_id, *index = result["custom_id"].split(":")
+            article_id = uuid.UUID(article_id)
+            index = int(index[0]) if index else 0
+            response = result.get("response") or {}
+            if result.get("error") or response.get("status_code") != 200:
+                raise ValueError(result.get("error") or f"status {response.get('status_code')}")
+            content = response["body"]["choices"][0]["message"]["content"]
+        except Exception as e:
+            print(f"[BATCH] 결과 오류 ({result.get('custom_id')}): {e}")
+            summary["failed"] += 1
+            continue
+
+        article = articles.get(article_id)
+        if article is None or (article_id, kind) not in pending:
+            summary["skipped"] += 1
+            continue
+
+        try:
+            # Fails when the article was chunked differently when written
+            messages = asset_requests(article, kind)[index]
+            if not parse_asset(article, kind, content):
+                raise ValueError("empty result")
+        except Exception as e:
+            print(f"[BATCH] 파싱 실패 ({result['custom_id']}): {e}")
+            summary["failed"] += 1
+            continue
+
+        llm_cache.set(asset_cache_key(kind, messages), kind, MODEL, content)
+        answered[(article_id, kind)] = article
+
+    for (article_id, kind), article in answered.items():
+        contents = cached_contents(article, kind)
+        if contents is None:
+            summary["incomplete"] += 1
+            continue
+        try:
+            if not apply_asset(session, article, kind, contents):
+                raise ValueError("empty result")
+        except Exception as e:
+            print(f"[BATCH] 적용 실패 ({kind}:{article_id}): {e}")
+            summary["failed"] += 1
+            continue
+        summary["loaded"] += 1
+
+    session.commit()
+    print(f"[BATCH] 적재 완료: {summary}")
+    return summary
+
+
+# Load missing assets straight from the LLM cache
+def load_from_cache(session: Session, assets: Iterable[str] = BATCH_ASSETS) -> dict:
+    summary = {"loaded": 0, "skipped": 0, "failed": 0}
+    for article, kind in missing_assets(session, assets):
+        if kind == "bias" and article.press.media_bias is None:
+            summary["skipped"] += 1
+            continue
+        contents = cached_contents(article, kind)
+        if contents is None:
+            summary["skipped"] += 1
+            continue
+        try:
+            if apply_asset(session, article, kind, contents):
+                summary["loaded"] += 1
+        except Exception as e:
+            print(f"[BATCH] 캐시 파싱 실패 ({kind}:{article.id}): {e}")
+            summary["failed"] += 1
+    session.commit()
+    print(f"[BATCH] 캐시 적재 완료: {summary}")
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline batch generation of article assets")
+    parser.add_argument("--backend", default=BATCH_BACKEND, choices=["local", "openai"])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    write = commands.add_parser("write", help="write batch requests for missing assets")
+    write.add_argument("--out", default="batch_requests.jsonl")
+    write.add_argument("--assets", default=",".join(BATCH_ASSETS))
+
+    submit = commands.add_parser("submit", help="submit a request file")
+    submit.add_argument("path")
+
+    status = commands.add_parser("status", help="show batch status")
+    status.add_argument("batch_id")
+
+    load = commands.add_parser("load", help="load completed batch results")
+    source = load.add_mutually_exclusive_group(required=True)
+    source.add_argument("batch_id", nargs="?")
+    source.add_argument("--from-cache", action="store_true", help="load missing assets from the LLM cache")
+
+    run = commands.add_parser("run", help="write, submit, wait for and load a batch")
+    run.add_argument("--assets", default=",".join(BATCH_ASSETS))
+    run.add_argument("--poll", type=float, default=60)
+
+    args = parser.parse_args()
+
+    with Session(engine) as session:
+        if args.command == "write":
+            write_batch_requests(session, args.out, args.assets.split(","))
+        elif args.command == "submit":
+            print(get_backend(args.backend).submit(args.path))
+        elif args.command == "status":
+            print(get_backend(args.backend).status(args.batch_id))
+        elif args.command == "load":
+            if args.from_cache:
+                load_from_cache(session)
+            else:
+                load_batch_results(session, get_backend(args.backend).results(args.batch_id))
+        elif args.command == "run":
+            load_from_cache(session, args.assets.split(","))
+            path = os.path.join(BATCH_DIR, f"requests_{int(time.time())}.jsonl")
+            os.makedirs(BATCH_DIR, exist_ok=True)
+            if not write_batch_requests(session, path, args.assets.split(",")):
+                return
+            backend = get_backend(args.backend)
+            batch_id = backend.submit(path)
+            print(f"[BATCH] 제출: {batch_id}")
+            while (state := backend.status(batch_id)) not in ("completed", "failed", "expired", "cancelled"):
+                print(f"[BATCH] {batch_id}: {state}")
+                time.sleep(args.poll)
+            if state == "completed":
+                load_batch_results(session, backend.results(batch_id))
+            else:
+                print(f"[BATCH] {batch_id} 종료 상태: {state}")
+
+
+if __name__ == "__main__":
+    main()
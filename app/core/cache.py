@@ -0,0 +1,109 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+from fastapi import Request, Response
+
+# Response cache settings
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "300"))
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "256"))
+
+# Bumped whenever the data behind cached responses changes
+_data_version = 0
+_version_lock = threading.Lock()
+
+
+def get_data_version() -> int:
+    return _data_version
+
+
+def bump_data_version() -> int:
+    """
+    Invalidate every cached response built from older data.
+    """
+    global _data_version
+    with _version_lock:
+        _data_version += 1
+        return _data_version
+
+
+class CacheEntry:
+    __slots__ = ("body", "etag", "version", "expires_at")
+
+    def __init__(self, body: bytes, version: int, expires_at: float):
+        self.body = body
+        self.etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        self.version = version
+        self.expires_at = expires_at
+
+
+class ResponseCache:
+    """
+    In-process LRU cache of serialized responses with a TTL.
+
+    Entries built before the last bump_data_version() are treated as misses.
+    """
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_SIZE, ttl: float = RESPONSE_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[Hashable, CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> CacheEntry | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.version != _data_version or entry.expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: Hashable, body: bytes, version: int | None = None) -> CacheEntry:
+        entry = CacheEntry(
+            body,
+            _data_version if version is None else version,
+            time.monotonic() + self.ttl
+        )
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+response_cache = ResponseCache()
+
+
+# Serve a cached JSON body for the request, building it on a miss
+def cached_response(request: Request, build: Callable[[], bytes], cache: ResponseCache = response_cache) -> Response:
+    """
+    Return the cached body for this route and query string, with ETag/304 support.
+    """
+    key = (request.url.path, str(request.url.query))
+    entry = cache.get(key)
+    if entry is None:
+        # Read the version first so a bump during build is not masked
+        version = get_data_version()
+        entry = cache.set(key, build(), version)
+
+    headers = {
+        "ETag": entry.etag,
+        "Cache-Control": "no-cache",
+    }
+
+    if_none_match = request.headers.get("if-none-match", "")
+    if entry.etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=entry.body, media_type="application/json", headers=headers)
@@ -3,7 +3,7 @@ import os
 import psycopg2
 from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
 import subprocess
-from sqlalchemy import create_engine, insert
+from sqlalchemy import create_engine, insert, func
 from sqlalchemy.orm import Session, sessionmaker
 import sys
 import app.util.scraper
@@ -13,12 +13,19 @@ from app.models.press import Press
 from app.models.newschat import NewsChat
 from app.models.keyword import KeywordSummary
 from app.models.highlight import HighlightedArticle
+from app.models.storysummary import StorySummary
+from app.core.singleflight import SingleFlight
+from app.core.cache import bump_data_version
+from app.core.search import title_index
+from app.core import metrics
 import uuid
 from app.core.util import dotdict
 import json
-from typing import List
+import asyncio
+import time
+from typing import List, AsyncIterator
 
-from app.util.AI import generate_chat, generate_narrative, generate_highlighted_article, generate_keywords, detect_article_bias
+from app.util.AI import generate_chat, stream_chat, generate_narrative, generate_highlight_spans, generate_keywords, detect_article_bias, detect_press_bias, generate_article_assets
 from datetime import datetime, timedelta
 
 # Check for crawling flags
@@ -26,6 +33,17 @@ crawl_enabled = os.getenv("CRAWL", "false").lower() == "true"
 db_init_enabled = os.getenv("DB", "false").lower() == "true"
 article_json_path = os.getenv("ARTICLE_JSON_PATH", None)
 press_id_json_path = os.getenv("PRESS_ID_JSON_PATH", None)
+singleflight_mode = os.getenv("SINGLEFLIGHT_MODE", "local").lower()
+pregen_enabled = os.getenv("PREGEN", "false").lower() == "true"
+combined_generation = os.getenv("COMBINED_GENERATION", "false").lower() == "true"
+
+# Keyword summary window
+KEYWORD_WINDOW_HOURS = int(os.getenv("KEYWORD_WINDOW_HOURS", "24"))
+KEYWORD_GRANULARITY = os.getenv("KEYWORD_GRANULARITY", "daily").lower()
+KEYWORD_GRANULARITIES = {
+    "hourly": timedelta(hours=1),
+    "daily": timedelta(days=1),
+}
 
 # Fetch environmental variables
 load_dotenv(override=True)
@@ -59,138 +77,449 @@ def initialize_database(DB_NAME: str, DB_USER: str, DB_PASSWORD: str, DB_HOST: s
     except psycopg2.errors.DuplicateDatabase:
         print(f"Database '{DB_NAME}' already exists.")
     try:
-        subprocess.run(
-            [
-                "alembic",
-                "stamp",
-                "head"
-            ],
-            check=True
-        )
-        subprocess.run(
-            [
-                "alembic",
-                "revision",
-                "--autogenerate",
-                "-m",
-                "create database"
-            ],
-            check=True
-        )
+        # Apply the versioned migrations in alembic/versions
         subprocess.run([
             "alembic",
             "upgrade",
             "head"
         ], check=True)
     except subprocess.CalledProcessError as e:
-        print(f"Error running alembic revision: {e}")
+        print(f"Error running alembic upgrade: {e}")
     finally:
         cursor.close()
         conn.close()
 
-# Create news chat and add to DB
-def create_news_chat(article: Article, session: Session) -> List[NewsChat]:
-    """
-    Create a new news chat entry in the database.
-    """
-    chat_list = generate_chat(article, API_KEY=API_KEY)
-
+# Commit, rolling back on failure. Blocking, run it off the event loop
+def commit_or_rollback(session: Session) -> Exception | None:
     try:
-        session.add_all(chat_list)
         session.commit()
     except Exception as e:
-        print(f"Error creating news chat: {e}")
         session.rollback()
+        return e
+    return None
 
-    return chat_list
+# Whether any row of the model belongs to the article
+def has_rows(session: Session, model, article_id: uuid.UUID) -> bool:
+    return session.query(model.article_id).filter(model.article_id == article_id).first() is not None
 
-# Create summary and add to DB
-def create_summary(article: Article, session: Session) -> Article:
+# Create every missing asset with one combined call and add to DB
+async def create_combined_assets(article: Article, session: Session) -> None:
     """
-    Create a summary for the article.
+    Fill the article's missing chat, story summary, highlight and bias from a
+    single multi-task completion, stored in one commit of the given session.
+    Assets the response lacks are left to the per-asset generators.
     """
-    try:
-        story_summary = generate_narrative(article, API_KEY=API_KEY)
-        session.add(story_summary)
+    def missing() -> tuple:
+        session.refresh(article)
+        session.refresh(article, ["chat_lines", "story_summary"])
+        need = (
+            not article.chat_lines,
+            article.story_summary is None,
+            not has_rows(session, HighlightedArticle, article.id),
+            article.genre == "정치" and (article.media_bias is None or article.reporting_bias is None),
+            article.press,
+        )
+        # Hand the connection back to the pool while generating
         session.commit()
-    except Exception as e:
-        print("!!!!!")
-        print(f"Error creating summary: {e}")
-        session.rollback()
+        return need
+
+    async def generate() -> None:
+        need_chat, need_summary, need_highlight, need_bias, press = await asyncio.to_thread(missing)
+
+        if not (need_chat or need_summary or need_highlight or need_bias):
+            return
+
+        if need_bias:
+            try:
+                await create_press_bias(press, session)
+            except Exception as e:
+                print(f"[ERROR] 언론사 성향 판단 실패: {e}")
+
+        started = time.monotonic()
+        try:
+            assets = await generate_article_assets(article, API_KEY)
+        except Exception as e:
+            print(f"Error generating combined assets: {e}")
+            return
+
+        def save() -> Exception | None:
+            # Another worker may have stored some of them meanwhile
+            session.refresh(article, ["chat_lines", "story_summary"])
+            if need_chat and assets["chat"] and not article.chat_lines:
+                article.chat_lines.extend(assets["chat"])
+            if need_summary and assets["narrative"] and article.story_summary is None:
+                article.story_summary = assets["narrative"]
+            if need_highlight and assets["highlight"] and not has_rows(session, HighlightedArticle, article.id):
+                session.add(HighlightedArticle(article_id=article.id, spans=assets["highlight"]))
+            if need_bias and assets["bias"]:
+                article.media_bias = press.media_bias
+                article.reporting_bias = assets["bias"]["reporting_bias"]
+            return commit_or_rollback(session)
+
+        async def store() -> bool:
+            error = await asyncio.to_thread(save)
+            if error:
+                print(f"Error saving combined assets: {error}")
+            return True
+
+        stored = False
+        if need_chat and assets["chat"]:
+            # A stream leading the chat flight stores the chat alone
+            stored = await generation_flight.do((article.id, "chat"), store)
+        if not stored:
+            await store()
+
+        metrics.asset_generation_seconds.observe(time.monotonic() - started, asset="combined")
+
+    await generation_flight.do((article.id, "combined"), generate)
+
+# Chat lines stored for the article, in order
+def stored_news_chat(article_id: uuid.UUID) -> List[NewsChat]:
+    with Session(engine) as session:
+        return (
+            session.query(NewsChat)
+            .filter(NewsChat.article_id == article_id)
+            .order_by(NewsChat.order)
+            .all()
+        )
+
+# Article to generate the chat of, None once its lines are stored
+def article_without_chat(article_id: uuid.UUID) -> Article | None:
+    with Session(engine) as session:
+        if has_rows(session, NewsChat, article_id):
+            return None
+        return session.get(Article, article_id)
+
+# Add generated chat lines to DB unless another worker stored some first
+def save_news_chat(article_id: uuid.UUID, chat_lines: List[NewsChat]) -> None:
+    # Streamed lines may still be serialized after the commit
+    with Session(engine, expire_on_commit=False) as session:
+        if has_rows(session, NewsChat, article_id):
+            return
+        session.add_all(chat_lines)
+        error = commit_or_rollback(session)
+        if error:
+            print(f"Error creating news chat: {error}")
+
+# Create news chat and story summary concurrently and add to DB
+async def create_article_assets(article: Article, session: Session) -> Article:
+    """
+    Generate the news chat and the story summary for the article in parallel
+    and store both in one commit of the given session.
+
+    Runs under the (article_id, "chat") flight shared with stream_news_chat,
+    so a view arriving during a stream waits for it instead of generating
+    the lines a second time. Every session call ends its transaction, so
+    waiting on a flight or the LLM holds no pooled connection; the caller
+    should not hold one either.
+    """
+    if combined_generation:
+        await create_combined_assets(article, session)
+
+    def missing() -> tuple:
+        session.refresh(article, ["chat_lines", "story_summary"])
+        # Hand the connection back to the pool while generating
+        session.commit()
+        return not article.chat_lines, article.story_summary is None
+
+    def save(chat_lines: List[NewsChat] | None, narrative: StorySummary | None) -> Exception | None:
+        # A stream may have stored the chat meanwhile
+        session.refresh(article, ["chat_lines", "story_summary"])
+        if chat_lines and not article.chat_lines:
+            article.chat_lines.extend(chat_lines)
+        if narrative is not None and article.story_summary is None:
+            article.story_summary = narrative
+        return commit_or_rollback(session)
+
+    async def generate(chat: bool) -> bool:
+        # Re-check under the flight, another worker may have just finished
+        need_chat, need_summary = await asyncio.to_thread(missing)
+        need_chat = chat and need_chat
+
+        tasks = {}
+        if need_chat:
+            tasks["chat"] = generate_chat(article, API_KEY=API_KEY)
+        if need_summary:
+            tasks["narrative"] = generate_narrative(article, API_KEY=API_KEY)
+
+        if not tasks:
+            print("[DEBUG] 기사 요약 이미 존재")
+            return True
+
+        started = time.monotonic()
+        results = dict(zip(tasks, await asyncio.gather(*tasks.values(), return_exceptions=True)))
+
+        for name, result in results.items():
+            if isinstance(result, BaseException):
+                print(f"Error generating article assets: {result}")
+                results[name] = None
+
+        error = await asyncio.to_thread(save, results.get("chat"), results.get("narrative"))
+        if error:
+            print(f"Error saving article assets: {error}")
+
+        metrics.asset_generation_seconds.observe(time.monotonic() - started, asset="view")
+        return True
+
+    # A stream leading the chat flight stores the chat alone
+    if not await generation_flight.do((article.id, "chat"), lambda: generate(chat=True)):
+        await generation_flight.do((article.id, "summary"), lambda: generate(chat=False))
+
+    # Followers load what the leader stored
+    if not (article.chat_lines and article.story_summary):
+        await asyncio.to_thread(missing)
 
     return article
 
+# Stream news chat lines and add to DB once complete
+async def stream_news_chat(article_id: uuid.UUID) -> AsyncIterator[NewsChat]:
+    """
+    Yield the article's chat lines, streaming them from OpenAI when none are
+    stored yet. Streamed lines are persisted in bulk at the end.
+
+    The stream runs under the (article_id, "chat") flight shared with
+    create_article_assets. Joining a chat generated elsewhere yields its lines
+    once stored. The generation is not cancelled when the client leaves.
+    """
+    key = (article_id, "chat")
+    if not generation_flight.in_flight(key):
+        chat_lines = await asyncio.to_thread(stored_news_chat, article_id)
+        if chat_lines:
+            for chat_line in chat_lines:
+                yield chat_line
+            return
+
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def generate() -> None:
+        # Re-check under the flight, another worker may have just finished
+        article = await asyncio.to_thread(article_without_chat, article_id)
+        if article is None:
+            return
+
+        chat_lines = []
+        async for chat_line in stream_chat(article, API_KEY=API_KEY):
+            chat_lines.append(chat_line)
+            queue.put_nowait(chat_line)
+        await asyncio.to_thread(save_news_chat, article_id, chat_lines)
+
+    def finished(flight: asyncio.Future) -> None:
+        # Retrieved here when the client left before the end
+        flight.cancelled() or flight.exception()
+        queue.put_nowait(None)
+
+    flight = asyncio.ensure_future(generation_flight.do(key, generate))
+    flight.add_done_callback(finished)
+
+    streamed = False
+    while (chat_line := await queue.get()) is not None:
+        streamed = True
+        yield chat_line
+    await flight
+
+    # Lines generated by another caller, read back once stored
+    if not streamed:
+        for chat_line in await asyncio.to_thread(stored_news_chat, article_id):
+            yield chat_line
+
+# Bucket start of a timestamp for the given granularity
+def keyword_bucket(timestamp: datetime, granularity: str) -> datetime:
+    if granularity == "hourly":
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+# Stored keywords of one bucket, else the titles to generate them from
+def bucket_keywords_or_titles(bucket: datetime, granularity: str) -> tuple:
+    with Session(engine) as session:
+        existing = (
+            session.query(KeywordSummary)
+            .filter(KeywordSummary.date == bucket, KeywordSummary.granularity == granularity)
+            .first()
+        )
+        if existing:
+            return existing.keywords, None
+
+        bucket_end = bucket + KEYWORD_GRANULARITIES[granularity]
+        titles = session.query(Article.title).filter(
+            Article.published_at >= bucket,
+            Article.published_at < bucket_end
+        ).all()
+        return None, [t[0] for t in titles]
+
+def save_bucket_keywords(bucket: datetime, granularity: str, keywords: list) -> None:
+    with Session(engine) as session:
+        session.add(KeywordSummary(date=bucket, granularity=granularity, keywords=keywords))
+        error = commit_or_rollback(session)
+        if error:
+            print(f"Error saving keywords: {error}")
+
+# Generate (or load) the keywords of one bucket
+async def create_bucket_keywords(bucket: datetime, granularity: str) -> list:
+    """
+    Buckets are generated concurrently, each on its own session.
+    """
+    async def generate() -> list:
+        keywords, titles = await asyncio.to_thread(bucket_keywords_or_titles, bucket, granularity)
+        if keywords is not None:
+            return keywords
+
+        if not titles:
+            return []
+
+        print(f"[DEBUG] 키워드 생성: {bucket} ({granularity}), 기사 {len(titles)}개")
+        raw_result = await generate_keywords(titles, API_KEY)
+        keywords = [
+            {"keyword": item["keyword"], "score": item["score"]}
+            for item in raw_result["keywords"]
+        ]
+
+        await asyncio.to_thread(save_bucket_keywords, bucket, granularity, keywords)
+
+        return keywords
+
+    return await generation_flight.do(("keywords", granularity, bucket.isoformat()), generate)
+
+# Drop cached keyword buckets touched by newly ingested articles
+def invalidate_keyword_buckets(published_ats: List[datetime], session: Session) -> None:
+    for granularity in KEYWORD_GRANULARITIES:
+        buckets = {keyword_bucket(published_at, granularity) for published_at in published_ats}
+        if not buckets:
+            continue
+        session.query(KeywordSummary).filter(
+            KeywordSummary.granularity == granularity,
+            KeywordSummary.date.in_(buckets)
+        ).delete(synchronize_session=False)
+    session.commit()
+
 # 오늘의 키워드
-def create_keyword_summary(session: Session) -> dict:
-    now = datetime.now()
-    start_time = now - timedelta(hours=24)
+async def create_keyword_summary(session: Session, window_hours: int = KEYWORD_WINDOW_HOURS, granularity: str = KEYWORD_GRANULARITY) -> dict:
+    """
+    Keywords over the sliding window ending at the latest published article.
 
-    titles = session.query(Article.title).all()
-    titles = [t[0] for t in titles]
+    Keywords are generated and cached per bucket (hourly or daily) and merged
+    across the window, so only buckets without a cached summary cost a call.
+    """
+    if granularity not in KEYWORD_GRANULARITIES:
+        raise ValueError(f"Unknown granularity: {granularity}")
 
-    if not titles:
+    latest = await asyncio.to_thread(lambda: session.query(func.max(Article.published_at)).scalar())
+    if latest is None:
         return {"error": "No recent articles found."}
 
-    today = now.date()
-    existing = session.query(KeywordSummary).filter(KeywordSummary.date == today).first()
-
-    if existing:
-        print("[DEBUG] 오늘 키워드 이미 존재")
-        return existing.keywords
+    # published_at is naive KST, comparing it to the host clock cuts the
+    # window short on UTC hosts
+    window_end = latest + timedelta(microseconds=1)
+    window_start = window_end - timedelta(hours=window_hours)
+
+    step = KEYWORD_GRANULARITIES[granularity]
+    buckets = []
+    bucket = keyword_bucket(window_start, granularity)
+    while bucket < window_end:
+        buckets.append(bucket)
+        bucket += step
+
+    bucket_keywords = await asyncio.gather(*(
+        create_bucket_keywords(bucket, granularity) for bucket in buckets
+    ))
+
+    # Merge bucket keywords by total importance
+    totals = {}
+    for keywords in bucket_keywords:
+        for item in keywords:
+            try:
+                score = int(item["score"])
+            except (TypeError, ValueError):
+                score = 1
+            totals[item["keyword"]] = totals.get(item["keyword"], 0) + score
+
+    if not totals:
+        return {"error": "No recent articles found."}
 
-    raw_result = generate_keywords(titles, API_KEY)
-    raw_keywords = raw_result["keywords"]
+    top_keywords = sorted(totals.items(), key=lambda item: item[1], reverse=True)[:5]
+    max_total = top_keywords[0][1] or 1
 
     # 각 키워드에 대해 activity_score가 가장 높은 기사 ID 찾기
+    await asyncio.to_thread(title_index.ensure_built, session)
+
     keywords_with_article = []
-    for item in raw_keywords:
-        keyword = item["keyword"]
-        score = item["score"]
-        best_article = (
-            session.query(Article)
-            .filter(Article.title.ilike(f"%{keyword}%"))
-            .order_by(Article.activity_score.desc())
-            .first()
-        )
-        article_id = str(best_article.id) if best_article else None
+    for keyword, total in top_keywords:
+        best_article_id = title_index.best(keyword, since=buckets[0], until=buckets[-1] + step)
+        article_id = str(best_article_id) if best_article_id else None
         keywords_with_article.append({
             "keyword": keyword,
-            "score": score,
+            "score": str(max(1, round(5 * total / max_total))),
             "article_id": article_id
         })
 
-    keyword_entry = KeywordSummary(date=today, keywords=keywords_with_article)
-
-    try:
-        session.add(keyword_entry)
-        session.commit()
-    except Exception as e:
-        print(f"Error saving keywords: {e}")
-        session.rollback()
-
     return keywords_with_article
 
 # 집중 읽기 모드
-def create_highlighted_article(article: Article, session: Session) -> str:
-    existing = session.query(HighlightedArticle).filter(HighlightedArticle.article_id == article.id).first()
-    if existing:
-        return existing.highlighted_text
-    
-    highlighted_text = generate_highlighted_article(article, API_KEY)
+async def create_highlighted_article(article: Article, session: Session) -> dict:
+    """
+    Return the article's highlight as {"spans": [[start, end], ...]} with
+    offsets into article.content, or {"highlighted_text": ...} for rows
+    stored before spans.
+    """
+    if combined_generation:
+        await create_combined_assets(article, session)
 
-    new_entry = HighlightedArticle(article_id=article.id, highlighted_text=highlighted_text)
+    async def generate() -> dict:
+        existing = await asyncio.to_thread(
+            lambda: session.query(HighlightedArticle).filter(HighlightedArticle.article_id == article.id).first()
+        )
+        if existing:
+            return {"spans": existing.spans, "highlighted_text": existing.highlighted_text}
 
-    try:
-        session.add(new_entry)
+        started = time.monotonic()
+        spans = await generate_highlight_spans(article, API_KEY)
+        if not spans:
+            return {"spans": [], "highlighted_text": None}
+
+        session.add(HighlightedArticle(article_id=article.id, spans=spans))
+        error = await asyncio.to_thread(commit_or_rollback, session)
+        if error:
+            print(f"Error saving highlighted article: {error}")
+
+        metrics.asset_generation_seconds.observe(time.monotonic() - started, asset="highlight")
+
+        return {"spans": spans, "highlighted_text": None}
+
+    return await generation_flight.do((article.id, "highlight"), generate)
+
+# 언론사 성향
+async def create_press_bias(press: Press, session: Session) -> str:
+    """
+    Return the press leaning, asking the LLM once per press and storing it
+    on the press row.
+    """
+    if press.media_bias is not None:
+        return press.media_bias
+
+    def refresh() -> None:
+        session.refresh(press)
+        # Hand the connection back to the pool while generating
         session.commit()
-    except Exception as e:
-        print(f"Error saving highlighted article: {e}")
-        session.rollback()
 
-    return highlighted_text
+    async def generate() -> str:
+        await asyncio.to_thread(refresh)
+        if press.media_bias is not None:
+            return press.media_bias
+
+        media_bias = await detect_press_bias(press.name, API_KEY)
+        press.media_bias = media_bias
+
+        error = await asyncio.to_thread(commit_or_rollback, session)
+        if error:
+            print(f"[ERROR] 언론사 성향 저장 실패: {error}")
+        else:
+            print(f"[DEBUG] 언론사 성향 저장: {press.name} -> {media_bias}")
+
+        return media_bias
+
+    return await generation_flight.do(("press_bias", press.id), generate)
 
 # 편향 감지
-def update_article_bias(article: Article, session: Session) -> dict:
+async def update_article_bias(article: Article, session: Session) -> dict:
     # 정치 기사 확인
     if article.genre != "정치":
         return {"media_bias": None, "reporting_bias": None}
@@ -198,22 +527,37 @@ def update_article_bias(article: Article, session: Session) -> dict:
     if article.media_bias is not None and article.reporting_bias is not None:
         return {"media_bias": article.media_bias, "reporting_bias": article.reporting_bias}
 
-    media_name = article.press.name
-    content = article.content
+    if combined_generation:
+        await create_combined_assets(article, session)
 
-    bias_result = detect_article_bias(media_name, content, API_KEY)
+    def refresh() -> Press:
+        session.refresh(article)
+        return article.press
 
-    article.media_bias = bias_result["media_bias"]
-    article.reporting_bias = bias_result["reporting_bias"]
+    async def generate() -> dict:
+        # Another worker may have stored the verdict while we waited
+        press = await asyncio.to_thread(refresh)
+        if article.media_bias is not None and article.reporting_bias is not None:
+            return {"media_bias": article.media_bias, "reporting_bias": article.reporting_bias}
 
-    try:
-        session.commit()
-        print("[DEBUG] 기사 편향 정보 업데이트 완료")
-    except Exception as e:
-        print(f"[ERROR] 편향 정보 업데이트 실패: {e}")
-        session.rollback()
+        started = time.monotonic()
+        media_bias = await create_press_bias(press, session)
+        bias_result = await detect_article_bias(press.name, media_bias, article.content, API_KEY)
+
+        article.media_bias = media_bias
+        article.reporting_bias = bias_result["reporting_bias"]
+
+        error = await asyncio.to_thread(commit_or_rollback, session)
+        if error:
+            print(f"[ERROR] 편향 정보 업데이트 실패: {error}")
+        else:
+            print("[DEBUG] 기사 편향 정보 업데이트 완료")
+
+        metrics.asset_generation_seconds.observe(time.monotonic() - started, asset="bias")
 
-    return bias_result
+        return {"media_bias": media_bias, "reporting_bias": bias_result["reporting_bias"]}
+
+    return await generation_flight.do((article.id, "bias"), generate)
 
 if db_init_enabled:
     try:
@@ -225,6 +569,9 @@ if db_init_enabled:
 # Create session
 engine = create_engine(SQLALCHEMY_DATABASE_URI)
 
+# Deduplicate concurrent LLM generations per (article_id, asset kind)
+generation_flight = SingleFlight(singleflight_mode, engine)
+
 try:
     SessionLocal = sessionmaker(bind=engine)
     session = SessionLocal()
@@ -336,9 +683,18 @@ if crawl_enabled and session:
         print("Complete!\n Flushing...")
         session.flush()
         session.commit()
+        bump_data_version()
+        title_index.refresh(session)
+        invalidate_keyword_buckets(
+            [datetime.fromisoformat(str(a.published_at)) for a in new_articles],
+            session
+        )
 
         print("Complete!")
 
+        # Pre-generate LLM assets once the app is up
+        pregen_enabled = True
+
     except Exception as e:
         print(f"Error during crawling: {e}")
         exit(-1)
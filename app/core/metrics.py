@@ -0,0 +1,133 @@
+import bisect
+import threading
+from typing import Dict, List, Tuple
+
+# Seconds, from cached lookups up to slow cold generations
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 80)
+TOKEN_BUCKETS = (100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+INF_LABEL = 'le="+Inf"'
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    """
+    Monotonic counter with optional labels.
+    """
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}" for key, value in values]
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram with optional labels.
+    """
+
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: (count per bucket with +Inf last, sum)
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[index] += 1
+            self._values[key] = (counts, total + value)
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            values = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+
+        lines = []
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}")
+            cumulative += counts[-1]
+            lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, INF_LABEL)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[Counter | Histogram] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """
+        Every metric in the Prometheus text exposition format.
+        """
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+# LLM calls, labelled by asset kind
+llm_requests = registry.register(Counter("llm_requests_total", "OpenAI requests sent, including retries", ("kind",)))
+llm_request_seconds = registry.register(Histogram("llm_request_duration_seconds", "Latency of completed OpenAI requests", ("kind",)))
+llm_retries = registry.register(Counter("llm_retries_total", "OpenAI requests retried after 429/5xx/timeouts", ("kind",)))
+llm_errors = registry.register(Counter("llm_errors_total", "OpenAI requests that failed for good", ("kind",)))
+llm_prompt_tokens = registry.register(Counter("llm_prompt_tokens_total", "Prompt tokens reported by OpenAI", ("kind",)))
+llm_completion_tokens = registry.register(Counter("llm_completion_tokens_total", "Completion tokens reported by OpenAI", ("kind",)))
+llm_request_tokens = registry.register(Histogram("llm_request_tokens", "Total tokens per OpenAI request", ("kind",), TOKEN_BUCKETS))
+llm_parse_failures = registry.register(Counter("llm_parse_failures_total", "Completions that failed to parse", ("kind",)))
+llm_cache_lookups = registry.register(Counter("llm_cache_lookups_total", "LLM cache lookups", ("kind", "result")))
+
+# Asset generation end to end, only when something had to be generated
+asset_generation_seconds = registry.register(Histogram("asset_generation_duration_seconds", "Time to generate and store a missing article asset", ("asset",)))
+
+# HTTP routes, labelled by route template
+http_request_seconds = registry.register(Histogram("http_request_duration_seconds", "Latency of HTTP requests until response headers", ("method", "route", "status")))
@@ -0,0 +1,177 @@
+import asyncio
+import os
+import time
+import uuid
+from typing import List
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.db import engine, create_article_assets, create_highlighted_article, update_article_bias
+from app.models.article import Article
+
+# Pre-generation settings
+PREGEN_TOP_N = int(os.getenv("PREGEN_TOP_N", "10"))
+PREGEN_CONCURRENCY = int(os.getenv("PREGEN_CONCURRENCY", "4"))
+
+# Asset kinds generated per article, in the order a reader hits them
+PREGEN_ASSETS = ("view", "highlight", "bias")
+
+# Progress of the current (or last) run
+progress = {
+    "running": False,
+    "total": 0,
+    "done": 0,
+    "failed": 0,
+    "started_at": None,
+    "finished_at": None,
+}
+
+# Progress of the current (or last) bulk bias run
+bias_progress = dict(progress)
+_bias_task: asyncio.Task | None = None
+
+
+# Select top articles of every genre by activity score
+def select_pregen_articles(session: Session, top_n: int = PREGEN_TOP_N) -> List[uuid.UUID]:
+    """
+    Return ids of the top_n articles per genre, most active first.
+    """
+    rank = func.row_number().over(
+        partition_by=Article.genre,
+        order_by=Article.activity_score.desc()
+    ).label("rank")
+
+    ranked = select(Article.id, Article.activity_score, rank).subquery()
+
+    statement = (
+        select(ranked.c.id)
+        .where(ranked.c.rank <= top_n)
+        .order_by(ranked.c.activity_score.desc())
+    )
+
+    return list(session.execute(statement).scalars().all())
+
+
+# Generate a single asset for a single article
+async def _pregenerate_asset(article_id: uuid.UUID, kind: str) -> None:
+    # Used from worker threads only, commits keep the loaded attributes
+    session = Session(engine, expire_on_commit=False)
+
+    def load() -> Article | None:
+        article = session.get(Article, article_id)
+        # Hold no pooled connection while the generation waits
+        session.commit()
+        return article
+
+    try:
+        article = await asyncio.to_thread(load)
+        if not article:
+            return
+
+        if kind == "view":
+            await create_article_assets(article, session)
+        elif kind == "highlight":
+            await create_highlighted_article(article, session)
+        elif kind == "bias":
+            await update_article_bias(article, session)
+    finally:
+        await asyncio.to_thread(session.close)
+
+
+async def _worker(queue: asyncio.Queue, state: dict) -> None:
+    while True:
+        job = await queue.get()
+        try:
+            await _pregenerate_asset(*job)
+        except Exception as e:
+            state["failed"] += 1
+            print(f"[PREGEN] {job[1]} 생성 실패 ({job[0]}): {e}")
+        finally:
+            state["done"] += 1
+            queue.task_done()
+
+        if state["done"] % 10 == 0 or state["done"] == state["total"]:
+            print(f"[PREGEN] {state['done']}/{state['total']} (failed {state['failed']})")
+
+
+# Run (article_id, kind) jobs on a bounded worker pool, tracking them in state
+async def _run_jobs(jobs: List[tuple[uuid.UUID, str]], concurrency: int, state: dict) -> dict:
+    queue: asyncio.Queue = asyncio.Queue()
+    for job in jobs:
+        queue.put_nowait(job)
+
+    state.update(
+        running=True,
+        total=queue.qsize(),
+        done=0,
+        failed=0,
+        started_at=time.time(),
+        finished_at=None,
+    )
+    print(f"[PREGEN] {state['total']}개 작업 시작 (concurrency={concurrency})")
+
+    workers = [asyncio.create_task(_worker(queue, state)) for _ in range(max(1, concurrency))]
+    try:
+        await queue.join()
+    finally:
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        state.update(running=False, finished_at=time.time())
+
+    print(f"[PREGEN] 완료: {state['done']}/{state['total']} (failed {state['failed']}), {state['finished_at'] - state['started_at']:.1f}s")
+    return state
+
+
+# Pre-generate LLM assets for the most active articles
+async def pregenerate_assets(top_n: int = PREGEN_TOP_N, concurrency: int = PREGEN_CONCURRENCY) -> dict:
+    """
+    Generate chat, story summary, highlight and bias for the top_n articles
+    of every genre, with at most `concurrency` generations in flight.
+    """
+    if progress["running"]:
+        print("[PREGEN] 이미 실행 중")
+        return progress
+
+    def load_ids() -> List[uuid.UUID]:
+        with Session(engine) as session:
+            return select_pregen_articles(session, top_n)
+
+    article_ids = await asyncio.to_thread(load_ids)
+
+    print(f"[PREGEN] {len(article_ids)}개 기사 사전 생성")
+    return await _run_jobs([(article_id, kind) for article_id in article_ids for kind in PREGEN_ASSETS], concurrency, progress)
+
+
+# Detect bias of every 정치 article still missing it
+async def precompute_bias(concurrency: int = PREGEN_CONCURRENCY) -> dict:
+    """
+    Press leanings are resolved once per press along the way, so each
+    article only costs a short reporting-bias call.
+    """
+    if bias_progress["running"]:
+        print("[PREGEN] 편향 사전 계산 이미 실행 중")
+        return bias_progress
+
+    def load_ids() -> List[uuid.UUID]:
+        with Session(engine) as session:
+            return session.execute(
+                select(Article.id)
+                .where(Article.genre == "정치")
+                .where(or_(Article.media_bias.is_(None), Article.reporting_bias.is_(None)))
+                .order_by(Article.activity_score.desc())
+            ).scalars().all()
+
+    article_ids = await asyncio.to_thread(load_ids)
+
+    print(f"[PREGEN] 정치 기사 {len(article_ids)}개 편향 사전 계산")
+    return await _run_jobs([(article_id, "bias") for article_id in article_ids], concurrency, bias_progress)
+
+
+# Start precompute_bias in the background unless a run is in progress
+def start_bias_precompute(concurrency: int = PREGEN_CONCURRENCY) -> dict:
+    global _bias_task
+    if _bias_task is None or _bias_task.done():
+        _bias_task = asyncio.create_task(precompute_bias(concurrency))
+    return bias_progress
@@ -0,0 +1,95 @@
+import threading
+import uuid
+from datetime import datetime
+from typing import Iterable, List, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.article import Article
+
+
+def _grams(text: str, n: int) -> set[str]:
+    if len(text) < n:
+        return set()
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+class TitleIndex:
+    """
+    In-memory character n-gram inverted index over article titles.
+
+    search(keyword) returns the ids of articles whose title contains the
+    keyword (case-insensitive, like ILIKE '%keyword%'), most active first.
+    """
+
+    def __init__(self, n: int = 2):
+        self.n = n
+        self.built = False
+        self._titles: dict[uuid.UUID, Tuple[str, float, datetime | None]] = {}
+        self._postings: dict[str, set[uuid.UUID]] = {}
+        self._lock = threading.Lock()
+
+    def build(self, rows: Iterable[Tuple[uuid.UUID, str, float, datetime | None]]) -> None:
+        """
+        Replace the index with (id, title, activity_score, published_at) rows.
+        """
+        titles = {}
+        postings: dict[str, set[uuid.UUID]] = {}
+
+        for article_id, title, activity_score, published_at in rows:
+            title = (title or "").lower()
+            titles[article_id] = (title, activity_score or 0, published_at)
+            for gram in set(title) | _grams(title, self.n):
+                postings.setdefault(gram, set()).add(article_id)
+
+        with self._lock:
+            self._titles = titles
+            self._postings = postings
+            self.built = True
+
+    def refresh(self, session: Session) -> None:
+        rows = session.execute(select(Article.id, Article.title, Article.activity_score, Article.published_at)).all()
+        self.build(rows)
+        print(f"[DEBUG] 제목 색인 갱신: {len(rows)}개 기사")
+
+    def ensure_built(self, session: Session) -> None:
+        if not self.built:
+            self.refresh(session)
+
+    def search(self, keyword: str, limit: int | None = None, since: datetime | None = None, until: datetime | None = None) -> List[uuid.UUID]:
+        keyword = keyword.strip().lower()
+        if not keyword:
+            return []
+
+        grams = _grams(keyword, self.n) or set(keyword)
+
+        with self._lock:
+            titles = self._titles
+            postings = self._postings
+
+        candidate_sets = sorted((postings.get(gram, set()) for gram in grams), key=len)
+        candidates = set(candidate_sets[0]).intersection(*candidate_sets[1:]) if candidate_sets else set()
+
+        # n-gram hits are candidates only, confirm the substring
+        matches = [article_id for article_id in candidates if keyword in titles[article_id][0]]
+
+        # Restrict to articles published in [since, until)
+        if since is not None or until is not None:
+            matches = [
+                article_id for article_id in matches
+                if titles[article_id][2] is not None
+                and (since is None or titles[article_id][2] >= since)
+                and (until is None or titles[article_id][2] < until)
+            ]
+
+        matches.sort(key=lambda article_id: (titles[article_id][1], str(article_id)), reverse=True)
+
+        return matches[:limit] if limit is not None else matches
+
+    def best(self, keyword: str, since: datetime | None = None, until: datetime | None = None) -> uuid.UUID | None:
+        matches = self.search(keyword, limit=1, since=since, until=until)
+        return matches[0] if matches else None
+
+
+title_index = TitleIndex()
@@ -0,0 +1,113 @@
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Hashable
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+
+# Single-flight modes
+LOCAL = "local"
+POSTGRES = "postgres"
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls for the same key into one execution.
+
+    In local mode only one coroutine per process runs the call, every other
+    caller awaits its result. In postgres mode the leader additionally holds a
+    Postgres advisory lock for the key, so leaders in other workers wait for it
+    and should re-check the database before generating again.
+
+    The call runs in its own task: cancelling a caller, the first one
+    included, does not cancel it for the others.
+    """
+
+    def __init__(self, mode: str = LOCAL, engine: Engine | None = None, poll_interval: float = 0.1):
+        if mode not in (LOCAL, POSTGRES):
+            raise ValueError(f"Unknown single-flight mode: {mode}")
+        if mode == POSTGRES and engine is None:
+            raise ValueError("Postgres single-flight mode requires an engine")
+
+        self.mode = mode
+        self.engine = engine
+        self.poll_interval = poll_interval
+        self._calls: dict[Hashable, asyncio.Future] = {}
+        # One connection outside the pool holds every advisory lock of the process
+        self._conn: Connection | None = None
+        self._conn_lock = threading.Lock()
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn once for all concurrent callers of key and return its result.
+        """
+        flight = self._calls.get(key)
+        if flight is None:
+            flight = asyncio.ensure_future(self._call(key, fn))
+            flight.add_done_callback(lambda f: self._finished(key, f))
+            self._calls[key] = flight
+
+        return await asyncio.shield(flight)
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    async def _call(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        async with self._lock(key):
+            return await fn()
+
+    def _finished(self, key: Hashable, flight: asyncio.Future) -> None:
+        # Mark exceptions as retrieved when every caller has left
+        flight.cancelled() or flight.exception()
+        if self._calls.get(key) is flight:
+            del self._calls[key]
+
+    @asynccontextmanager
+    async def _lock(self, key: Hashable):
+        if self.mode != POSTGRES:
+            yield
+            return
+
+        lock_key = ":".join(str(part) for part in key) if isinstance(key, tuple) else str(key)
+        # Polled rather than blocking in pg_advisory_lock, so waiting neither
+        # ties up a worker thread nor needs a connection of its own
+        while not await self._advisory("pg_try_advisory_lock", lock_key):
+            await asyncio.sleep(self.poll_interval)
+        try:
+            yield
+        finally:
+            await self._advisory("pg_advisory_unlock", lock_key)
+
+    async def _advisory(self, function: str, lock_key: str) -> bool:
+        call = asyncio.ensure_future(asyncio.to_thread(self._execute, function, lock_key))
+        try:
+            # Runs to completion in its thread even if the caller is cancelled
+            return await asyncio.shield(call)
+        except asyncio.CancelledError:
+            if function == "pg_try_advisory_lock":
+                call.add_done_callback(lambda c: self._release_abandoned(c, lock_key))
+            raise
+
+    def _release_abandoned(self, call: asyncio.Future, lock_key: str) -> None:
+        if not call.cancelled() and call.exception() is None and call.result():
+            asyncio.ensure_future(asyncio.to_thread(self._execute, "pg_advisory_unlock", lock_key))
+
+    def _execute(self, function: str, lock_key: str) -> bool:
+        # Blocking, run it off the event loop
+        with self._conn_lock:
+            if self._conn is None:
+                conn = self.engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+                # Kept for the life of the process, it must not count against the pool
+                conn.detach()
+                self._conn = conn
+            try:
+                return self._conn.execute(
+                    text(f"SELECT {function}(hashtextextended(:key, 0))"), {"key": lock_key}
+                ).scalar()
+            except DBAPIError:
+                # The server dropped the locks with the connection, reconnect next time
+                self._conn.close()
+                self._conn = None
+                raise
@@ -1,5 +1,26 @@
+import base64
+import json
+import uuid
+
+
 class dotdict(dict):
     """dot.notation access to dictionary attributes"""
     __getattr__ = dict.get
     __setattr__ = dict.__setitem__
-    __delattr__ = dict.__delitem__
\ No newline at end of file
+    __delattr__ = dict.__delitem__
+
+
+# Keyset pagination cursor on (activity_score, id)
+def encode_cursor(activity_score: float, id: uuid.UUID) -> str:
+    raw = json.dumps([activity_score, str(id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[float, uuid.UUID]:
+    """Raises ValueError on a malformed cursor"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        activity_score, id = json.loads(raw)
+        return float(activity_score), uuid.UUID(id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
@@ -1,6 +1,26 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
 from app.api.main import api_router
 from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
+import asyncio
+import time
+from app.core import db, metrics
+from app.core.pregen import pregenerate_assets
+from app.util.llm_client import close_llm_clients
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pre-generate LLM assets in the background after ingestion
+    task = None
+    if db.pregen_enabled:
+        task = asyncio.create_task(pregenerate_assets())
+    yield
+    if task and not task.done():
+        task.cancel()
+    # Pooled LLM connections belong to this loop
+    await close_llm_clients()
 
 
 try:
@@ -8,6 +28,7 @@ try:
         title="VEWS",
         description="쉬운 한국어 뉴스, 뷰스",
         version="1.0.0",
+        lifespan=lifespan,
     )
 
     # 허용할 origin 목록
@@ -27,11 +48,36 @@ try:
     )
 
 
+    # Latency per route template, so /article/view/{id} is one series
+    @app.middleware("http")
+    async def record_latency(request: Request, call_next):
+        started = time.monotonic()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            route = request.scope.get("route")
+            metrics.http_request_seconds.observe(
+                time.monotonic() - started,
+                method=request.method,
+                route=getattr(route, "path", "unmatched"),
+                status=status,
+            )
+
+
     @app.get("/")
     async def root():   
         return {"message": "Hello World"}
 
 
+    # Prometheus metrics
+    @app.get("/metrics", include_in_schema=False)
+    def get_metrics():
+        return PlainTextResponse(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+
     app.include_router(api_router)
 except Exception as e:
     print(f"Error initializing FastAPI app: {e}")
@@ -1,5 +1,5 @@
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Table, LargeBinary, Float, ForeignKeyConstraint
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Table, LargeBinary, Float, ForeignKeyConstraint, Index
 from sqlalchemy.orm import relationship
 from app.models.base import Base
 from sqlalchemy.dialects.postgresql import UUID
@@ -14,7 +14,7 @@ class Article(Base):
     title = Column(String(255), nullable=False)
     url = Column(String(255), unique=True, nullable=False)
     content = Column(String, nullable=False)
-    published_at = Column(DateTime, nullable=False)
+    published_at = Column(DateTime, nullable=False, index=True)
     edited_at = Column(DateTime, nullable=True)
     narrative_summary = Column(String, nullable=True)
     image = Column(LargeBinary, nullable=True)
@@ -22,8 +22,8 @@ class Article(Base):
     ranking = Column(Integer, nullable=False, default=0)
     activity_score = Column(Float, nullable=False, default=0)
     genre = Column(String, nullable=False, default="")
-    author_id = Column(String, ForeignKey('authors.id'), nullable=False)
-    press_id = Column(String, ForeignKey('press.id'), nullable=False)
+    author_id = Column(String, ForeignKey('authors.id'), nullable=False, index=True)
+    press_id = Column(String, ForeignKey('press.id'), nullable=False, index=True)
     author = relationship("Author", back_populates="articles")
     press = relationship("Press", back_populates="articles")
     
@@ -33,5 +33,13 @@ class Article(Base):
     chat_lines = relationship("NewsChat", back_populates="article")
     story_summary = relationship("StorySummary", back_populates="article", uselist=False)
 
+    __table_args__ = (
+        # Keyset pagination of the activity-ranked feeds
+        Index("ix_articles_activity_score_id", activity_score.desc(), id.desc()),
+        Index("ix_articles_genre_activity_score_id", genre, activity_score.desc(), id.desc()),
+        # Substring (ILIKE '%kw%') search on titles, requires pg_trgm
+        Index("ix_articles_title_trgm", title, postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}),
+    )
+
     def __repr__(self):
         return f"<Article(id={self.id}, title={self.title}, url={self.url})>"
\ No newline at end of file
@@ -9,7 +9,7 @@ class Author(Base):
     id = Column(String, primary_key=True)
     author_key = Column(Integer, nullable=False)
     name = Column(String(50), nullable=False)
-    press_id = Column(String, ForeignKey('press.id'), nullable=False)
+    press_id = Column(String, ForeignKey('press.id'), nullable=False, index=True)
     press = relationship("Press", back_populates="authors")
     articles = relationship("Article", back_populates="author")
 
@@ -1,5 +1,5 @@
 # app/models/highlight.py
-from sqlalchemy import Column, ForeignKey, Text
+from sqlalchemy import Column, ForeignKey, JSON, Text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.models.base import Base
@@ -9,6 +9,9 @@ class HighlightedArticle(Base):
     __tablename__ = 'highlighted_articles'
 
     article_id = Column(UUID(as_uuid=True), ForeignKey('articles.id'), primary_key=True)
-    highlighted_text = Column(Text, nullable=False)
+    # [start, end) character offsets into Article.content
+    spans = Column(JSON, nullable=True)
+    # Marked-up copy of the article, only kept for rows from before spans
+    highlighted_text = Column(Text, nullable=True)
 
     article = relationship(Article, backref="highlighted_version")
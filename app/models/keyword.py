@@ -1,5 +1,5 @@
 # app/models/keyword.py
-from sqlalchemy import Column, String, DateTime, JSON
+from sqlalchemy import Column, String, DateTime, JSON, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.models.base import Base
@@ -10,5 +10,11 @@ class KeywordSummary(Base):
     __tablename__ = 'keyword_summaries'
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    date = Column(DateTime, unique=True, nullable=False)
+    # Start of the bucket the keywords were computed over
+    date = Column(DateTime, nullable=False)
+    granularity = Column(String(10), nullable=False, default="daily", server_default="daily")
     keywords = Column(JSON, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("date", "granularity", name="uq_keyword_summaries_date_granularity"),
+    )
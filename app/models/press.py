@@ -9,6 +9,8 @@ class Press(Base):
     id = Column(String, primary_key=True)
     name = Column(String(50), unique=True, nullable=False)
     logo_img_src = Column(String(120), nullable=True)
+    # Political leaning (보수 / 진보 / 중도), judged once per press
+    media_bias = Column(String(10), nullable=True)
 
     authors = relationship("Author", back_populates="press")
     articles = relationship("Article", back_populates="press")
@@ -42,3 +42,18 @@ class ArticleResponse(BaseModel):
 
     class Config:
         orm_mode = True
+
+class ArticleListResponse(BaseModel):
+    id: uuid.UUID
+    title: str
+    url: str
+    published_at: datetime
+    genre: str
+    activity_score: int
+    ranking: int
+    author: AuthorResponse
+    excerpt: str
+
+class ArticlePageResponse(BaseModel):
+    items: List[ArticleListResponse]
+    next_cursor: str | None = None
@@ -8,7 +8,7 @@ class StorySummary(Base):
     __tablename__ = "story_summary"
 
     id = Column(UUID(as_uuid=True), unique=True, primary_key=True)
-    article_id = Column(UUID, ForeignKey("articles.id"), nullable=False)
+    article_id = Column(UUID, ForeignKey("articles.id"), nullable=False, index=True)
     story = Column(String, nullable=False)
     dictionary = Column(JSON, nullable=False)
 
@@ -1,75 +1,202 @@
-from openai import OpenAI
 import os
 from dotenv import load_dotenv
 from app.models import Article, NewsChat, StorySummary
-from typing import List
-import ast
+from typing import Any, AsyncIterator, Callable, List
+import asyncio
 import uuid
-import re
 import json
+from app.util.highlight import merge_spans, resolve_spans
+from app.util.jsonstream import ObjectMemberStream, extract_json, salvage_json
+from app.util.llm_cache import llm_cache
+from app.util.llm_client import get_llm_client, record_usage
+from app.util.tokens import chunk_text, truncate_to_tokens
+from app.core import metrics
 
 load_dotenv()
 
 API_KEY = os.getenv("OPENAI_API_KEY")
 
-# Generate chat view
-def generate_chat(article: Article, API_KEY) -> List[NewsChat]:
+MODEL = "gpt-4o-mini"
+
+# Bump a version when its prompt's expected output or parser changes
+PROMPT_VERSIONS = {
+    "chat": 1,
+    "narrative": 1,
+    "keywords": 1,
+    "highlight": 2,
+    "bias": 2,
+    "press_bias": 1,
+    "combined": 3,
+}
+
+# Article tokens sent per request. Longer articles are split into parallel
+# chunks (chat, highlight) or cut at a sentence boundary (the rest)
+INPUT_BUDGETS = {
+    "chat": int(os.getenv("LLM_INPUT_BUDGET_CHAT", "2000")),
+    "highlight": int(os.getenv("LLM_INPUT_BUDGET_HIGHLIGHT", "2000")),
+    "narrative": int(os.getenv("LLM_INPUT_BUDGET_NARRATIVE", "4000")),
+    "bias": int(os.getenv("LLM_INPUT_BUDGET_BIAS", "4000")),
+    "combined": int(os.getenv("LLM_INPUT_BUDGET_COMBINED", "6000")),
+}
+
+# Ask the model to finish or fix a response that failed to parse
+async def recover_completion(kind: str, messages: list, content: str, finish_reason: str | None, API_KEY, **kwargs) -> str:
     """
-    Generate a chat summary for the given article using OpenAI's API.
-    
-    Args:
-        article (Article): The article for which to generate the chat summary.
-    
-    Returns:
-        NewsChat: The generated chat summary.
+    A response cut off by the token limit is continued from where it
+    stopped; any other malformed response is sent back alone to be fixed,
+    without the article, so neither costs a full regeneration.
     """
-    client = OpenAI(api_key=API_KEY)
+    client = get_llm_client(API_KEY)
+
+    if finish_reason == "length":
+        print(f"[DEBUG] {kind} 응답이 잘려 이어서 생성")
+        response = await client.create(
+            kind=f"{kind}_continue",
+            model=MODEL,
+            messages=messages + [
+                {"role": "assistant", "content": content},
+                {"role": "user", "content": "출력이 중간에 끊겼습니다. 끊긴 지점 바로 다음 글자부터 이어서 출력하세요. 앞부분은 반복하지 마세요."},
+            ],
+            **kwargs
+        )
+        return content + (response.choices[0].message.content or "")
 
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
+    print(f"[DEBUG] {kind} 응답 형식 오류, 수정 요청")
+    response = await client.create(
+        kind=f"{kind}_repair",
+        model=MODEL,
         messages=[
-            {"role": "system", "content": "You are an article-to-conversation converter."},
-            {"role": "user", "content": f"""다음은 뉴스 기사입니다. 이 기사의 주요 인물들이 실제로 말하는 것처럼, 대화를 구성해주세요. 아래의 조건을 반드시 지켜 주세요:
-                                          - "나", "친구"와 같은 기사 외 화자는 사용하지 마세요.
-                                          - 오직 기사 속 실제 인물, 단체, 기관(예: 바비킴, 제작진, 학생, 관객, 네티즌 등)만 발화할 수 있습니다.
-                                          - 각 인물에는 숫자 형태의 고유 id를 부여하세요.
-                                          - 각 발화는 1~2문장 이내로 자연스럽고 간결하게 작성하세요.
-                                          - 말투는 실제 대화처럼 질문, 반응, 설명이 섞인 형태여야 합니다.
-                                          - 정보의 흐름은 기사 순서를 따라가며 너무 과장되거나 요약식이 되지 않도록 하세요.
-                                          - 출력은 아래 형식의 JSON 딕셔너리로만 하세요. JSON 외 출력은 하지 마세요.
-                                            json dict entry의 키는 순서를 나타내며, 내용은 "id": 고유번호, "speaker": 기사 등장인물, "content": 대사 로 이루어져있습니다.
-                                                      {article.content}
-                                        """
-              }
-        ]
+            {"role": "system", "content": "You repair malformed JSON."},
+            {"role": "user", "content": f"다음 출력은 형식이 잘못되었거나 잘린 JSON입니다. 내용은 바꾸지 말고 올바른 JSON으로만 고쳐서 출력하세요. JSON 외 출력은 하지 마세요.\n\n{content}"},
+        ],
+    )
+    return response.choices[0].message.content or ""
+
+# Run a completion, reusing a cached one for the same prompt
+async def complete(kind: str, messages: list, parse: Callable[[str], Any], API_KEY, salvage: Callable[[str], Any] | None = None, **kwargs) -> Any:
+    """
+    Return parse(completion) for the messages.
+
+    Completions are looked up in the persistent LLM cache first and stored
+    there only once they parse, so a bad response is never replayed. A
+    response that fails to parse gets one continuation or repair call, and
+    failing that salvage(completion) keeps whatever was complete.
+    """
+    key = llm_cache.key(kind, PROMPT_VERSIONS[kind], MODEL, messages)
+
+    cached = await asyncio.to_thread(llm_cache.get, key)
+    if cached is not None:
+        try:
+            result = parse(cached)
+            if result:
+                print(f"[DEBUG] LLM cache hit ({kind})")
+                metrics.llm_cache_lookups.inc(kind=kind, result="hit")
+                return result
+        except Exception as e:
+            print(f"[ERROR] Cached {kind} response failed to parse: {e}")
+    metrics.llm_cache_lookups.inc(kind=kind, result="miss")
+
+    response = await get_llm_client(API_KEY).create(
+        kind=kind,
+        model=MODEL,
+        messages=messages,
+        **kwargs
     )
+    content = response.choices[0].message.content or ""
 
+    try:
+        result = parse(content)
+        error = None
+    except Exception as e:
+        result, error = None, e
+    if result:
+        await asyncio.to_thread(llm_cache.set, key, kind, MODEL, content)
+        return result
 
-    chat_summary_str = response.choices[0].message.content
-    if not chat_summary_str:
-        raise 
+    metrics.llm_parse_failures.inc(kind=kind)
+    print(f"[ERROR] {kind} response failed to parse: {error}")
 
-    chat_summary_str = re.sub(r"```(?:json)?\n?", "", chat_summary_str).replace("```", "").strip()
+    try:
+        recovered = await recover_completion(kind, messages, content, getattr(response.choices[0], "finish_reason", None), API_KEY, **kwargs)
+        result = parse(recovered)
+        if result:
+            await asyncio.to_thread(llm_cache.set, key, kind, MODEL, recovered)
+            return result
+    except Exception as e:
+        print(f"[ERROR] {kind} recovery failed: {e}")
 
-    chat_summary_dict = ast.literal_eval(chat_summary_str)
+    # Partial results are served but not cached, the next reader retries
+    if salvage is not None:
+        result = salvage(content)
+        if result:
+            print(f"[DEBUG] {kind} 부분 결과 사용")
+            return result
+
+    if error is not None:
+        raise error
+    return result
+
+# Chat view prompt
+def chat_messages(article: Article, content: str | None = None) -> list:
+    """
+    content is the part of the article to convert, the whole by default.
+    """
+    content = truncate_to_tokens(article.content, INPUT_BUDGETS["chat"]) if content is None else content
+    return [
+        {"role": "system", "content": "You are an article-to-conversation converter."},
+        {"role": "user", "content": f"""다음은 뉴스 기사입니다. 이 기사의 주요 인물들이 실제로 말하는 것처럼, 대화를 구성해주세요. 아래의 조건을 반드시 지켜 주세요:
+                                      - "나", "친구"와 같은 기사 외 화자는 사용하지 마세요.
+                                      - 오직 기사 속 실제 인물, 단체, 기관(예: 바비킴, 제작진, 학생, 관객, 네티즌 등)만 발화할 수 있습니다.
+                                      - 각 인물에는 숫자 형태의 고유 id를 부여하세요.
+                                      - 각 발화는 1~2문장 이내로 자연스럽고 간결하게 작성하세요.
+                                      - 말투는 실제 대화처럼 질문, 반응, 설명이 섞인 형태여야 합니다.
+                                      - 정보의 흐름은 기사 순서를 따라가며 너무 과장되거나 요약식이 되지 않도록 하세요.
+                                      - 출력은 아래 형식의 JSON 딕셔너리로만 하세요. JSON 외 출력은 하지 마세요.
+                                        json dict entry의 키는 순서를 나타내며, 내용은 "id": 고유번호, "speaker": 기사 등장인물, "content": 대사 로 이루어져있습니다.
+                                                  {content}
+                                    """
+        }
+    ]
+
+# Build a chat line from one parsed entry
+def chat_line(article: Article, key, value: dict) -> NewsChat:
+    return NewsChat(
+        id=uuid.uuid4(),
+        article_id=article.id,
+        speaker=value["id"],
+        speaker_name=value["speaker"],
+        content=value["content"],
+        order=int(key)
+    )
+
+# Build chat lines from a parsed chat dict
+def chat_lines(article: Article, chat_summary_dict: dict, partial: bool = False) -> List[NewsChat]:
+    if not isinstance(chat_summary_dict, dict):
+        raise ValueError("Chat response is not a JSON object.")
 
     news_chats = []
 
     for key, value in chat_summary_dict.items():
-        news_chats.append(NewsChat(
-            id=uuid.uuid4(),
-            article_id=article.id,
-            speaker=value["id"],
-            speaker_name=value["speaker"],
-            content=value["content"],
-            order=key
-          )
-        )
+        try:
+            news_chats.append(chat_line(article, key, value))
+        except (KeyError, TypeError, ValueError):
+            # A truncated response may end in a half-written line
+            if not partial:
+                raise
 
     return news_chats
 
-# Generate narritive view
-def generate_narrative(article: Article, API_KEY) -> StorySummary:
+# Parse chat view
+def parse_chat(article: Article, chat_summary_str: str | None) -> List[NewsChat]:
+    return chat_lines(article, extract_json(chat_summary_str))
+
+# Keep the complete lines of a broken chat response
+def salvage_chat(article: Article, chat_summary_str: str | None) -> List[NewsChat]:
+    chat_summary_dict = salvage_json(chat_summary_str)
+    return chat_lines(article, chat_summary_dict, partial=True) if isinstance(chat_summary_dict, dict) else []
+
+# Generate chat view
+async def generate_chat(article: Article, API_KEY) -> List[NewsChat]:
     """
     Generate a chat summary for the given article using OpenAI's API.
     
@@ -79,8 +206,103 @@ def generate_narrative(article: Article, API_KEY) -> StorySummary:
     Returns:
         NewsChat: The generated chat summary.
     """
-    client = OpenAI(api_key=API_KEY)
+    requests = chat_chunk_messages(article)
+    results = await asyncio.gather(*(
+        complete(
+            "chat",
+            messages,
+            lambda content: parse_chat(article, content),
+            API_KEY,
+            salvage=lambda content: salvage_chat(article, content)
+        )
+        for messages in requests
+    ))
+    if len(requests) == 1:
+        return results[0]
+
+    print(f"[DEBUG] 긴 기사 대화 {len(requests)}개 구간 병합")
+    return merge_chat_lines(results)
 
+# Chat prompts of the article, one per chunk of a long article
+def chat_chunk_messages(article: Article) -> List[list]:
+    return [chat_messages(article, chunk) for chunk in chunk_text(article.content, INPUT_BUDGETS["chat"])]
+
+# Merge the chat lines of consecutive article chunks
+def merge_chat_lines(chunk_lines: List[List[NewsChat]]) -> List[NewsChat]:
+    """
+    Lines are renumbered in chunk order and speaker ids are unified by
+    speaker name, since every chunk numbers its speakers from 1.
+    """
+    speakers = {}
+    merged = []
+    for lines in chunk_lines:
+        for line in sorted(lines or [], key=lambda line: line.order):
+            line.speaker = speakers.setdefault(line.speaker_name, len(speakers) + 1)
+            line.order = len(merged) + 1
+            merged.append(line)
+    return merged
+
+# Stream chat view line by line
+async def stream_chat(article: Article, API_KEY) -> AsyncIterator[NewsChat]:
+    """
+    Generate the chat summary with a streamed completion, yielding each
+    NewsChat as soon as its JSON entry is complete.
+    """
+    # Long articles are generated in parallel chunks instead
+    if len(chunk_text(article.content, INPUT_BUDGETS["chat"])) > 1:
+        for news_chat in await generate_chat(article, API_KEY):
+            yield news_chat
+        return
+
+    messages = chat_messages(article)
+    key = llm_cache.key("chat", PROMPT_VERSIONS["chat"], MODEL, messages)
+
+    cached = await asyncio.to_thread(llm_cache.get, key)
+    if cached is not None:
+        try:
+            news_chats = parse_chat(article, cached)
+        except Exception as e:
+            print(f"[ERROR] Cached chat response failed to parse: {e}")
+            news_chats = []
+        if news_chats:
+            metrics.llm_cache_lookups.inc(kind="chat", result="hit")
+            for news_chat in news_chats:
+                yield news_chat
+            return
+    metrics.llm_cache_lookups.inc(kind="chat", result="miss")
+
+    stream = await get_llm_client(API_KEY).create(
+        kind="chat",
+        model=MODEL,
+        messages=messages,
+        stream=True,
+        stream_options={"include_usage": True}
+    )
+
+    parser = ObjectMemberStream()
+    chunks = []
+    async for chunk in stream:
+        if getattr(chunk, "usage", None) is not None:
+            record_usage("chat", chunk.usage)
+        if not chunk.choices or not chunk.choices[0].delta.content:
+            continue
+        chunks.append(chunk.choices[0].delta.content)
+        for key_, value in parser.feed(chunk.choices[0].delta.content):
+            try:
+                yield chat_line(article, key_, value)
+            except (KeyError, TypeError, ValueError) as e:
+                print(f"[ERROR] Skipping malformed chat entry {key_}: {e}")
+
+    content = "".join(chunks)
+    try:
+        if parse_chat(article, content):
+            await asyncio.to_thread(llm_cache.set, key, "chat", MODEL, content)
+    except Exception as e:
+        metrics.llm_parse_failures.inc(kind="chat")
+        print(f"[ERROR] Streamed chat response failed to parse: {e}")
+
+# Narrative view prompt
+def narrative_messages(article: Article) -> list:
     prompt = (
         '다음은 뉴스 기사입니다. 이 기사를 일상적인 이야기로 비유해서 독자가 더 쉽게 이해할 수 있도록 재작성해주세요.\n'
         '\n'
@@ -102,36 +324,26 @@ def generate_narrative(article: Article, API_KEY) -> StorySummary:
         ']\n'
         '```\n\n'
         '※ narrative는 한글로 된 비유 이야기이며, dictionary는 실제 개념과의 매핑입니다.\n\n'
-        f'다음은 기사 내용입니다:\n{article.content}'
+        f'다음은 기사 내용입니다:\n{truncate_to_tokens(article.content, INPUT_BUDGETS["narrative"])}'
         )
-    
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {"role": "system", "content": "You are an article-to-narrative converter."},
-            {"role": "user", "content": prompt}
-        ]
-    )
-    content = response.choices[0].message.content
-
-    if content.startswith("```json"):
-        content = content.removeprefix("```json").removesuffix("```").strip()
-    elif content.startswith("```"):
-        content = content.removeprefix("```").removesuffix("```").strip()
+    return [
+        {"role": "system", "content": "You are an article-to-narrative converter."},
+        {"role": "user", "content": prompt}
+    ]
 
+# Parse narrative view
+def parse_narrative(article: Article, content: str | None) -> StorySummary | None:
     narrative = ""
     dictionary = {}
-    data = None
-    if content:
-        try:
-            data = json.loads(content)
-        except json.JSONDecodeError as e:
-            print(f"JSON decode error: {e}")
-            print(f"Raw content received from OpenAI:\n{content}")
-            return None
-    else:
+    if not content:
         print("No content received from OpenAI.")
         return None
+    try:
+        data = extract_json(content)
+    except ValueError as e:
+        print(f"JSON decode error: {e}")
+        print(f"Raw content received from OpenAI:\n{content}")
+        return None
     print(data)
     if isinstance(data, list) and data:
         item= data[0]
@@ -151,10 +363,26 @@ def generate_narrative(article: Article, API_KEY) -> StorySummary:
         dictionary=dictionary
     )
 
-# Generate keywords
-def generate_keywords(title_list: List[str], API_KEY) -> dict:
-    client = OpenAI(api_key=API_KEY)
+# Generate narritive view
+async def generate_narrative(article: Article, API_KEY) -> StorySummary:
+    """
+    Generate a chat summary for the given article using OpenAI's API.
+    
+    Args:
+        article (Article): The article for which to generate the chat summary.
+    
+    Returns:
+        NewsChat: The generated chat summary.
+    """
+    return await complete(
+        "narrative",
+        narrative_messages(article),
+        lambda content: parse_narrative(article, content),
+        API_KEY
+    )
 
+# Keywords prompt
+def keyword_messages(title_list: List[str]) -> list:
     formatted_titles = "\n".join(f"- {title}" for title in title_list)
 
     prompt = f'''
@@ -179,108 +407,247 @@ def generate_keywords(title_list: List[str], API_KEY) -> dict:
 {formatted_titles}
     '''
 
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {"role": "system", "content": "You are a news topic analyst."},
-            {"role": "user", "content": prompt}
-        ]
-    )
+    return [
+        {"role": "system", "content": "You are a news topic analyst."},
+        {"role": "user", "content": prompt}
+    ]
 
-    content = response.choices[0].message.content
-    
+# Parse keywords
+def parse_keywords(content: str | None) -> dict:
     print("[DEBUG] GPT 응답 원문:\n", content)
 
-    content = content.strip().removeprefix("```json").removesuffix("```").strip() if content else ""
     try:
-        return json.loads(content)
+        return extract_json(content)
     except Exception as e:
         print(f"[ERROR] JSON 파싱 실패: {e}")
         raise
 
-# Generate article highlights
-def generate_highlighted_article(article: Article, API_KEY) -> str:
-    client = OpenAI(api_key=API_KEY)
+# Generate keywords
+async def generate_keywords(title_list: List[str], API_KEY) -> dict:
+    return await complete("keywords", keyword_messages(title_list), parse_keywords, API_KEY)
 
+# Highlight prompt
+def highlight_messages(article: Article, content: str | None = None, count: str = "3~7") -> list:
+    """
+    content is the part of the article to annotate, the whole by default,
+    and count the number of highlights to ask for.
+    """
+    content = truncate_to_tokens(article.content, INPUT_BUDGETS["highlight"]) if content is None else content
     prompt = f'''
-    너는 뉴스 기사에서 사용자가 반드시 집중해서 읽어야 할 **중요한 구절이나 문장 전체**를 강조하는 시스템이다.
+    너는 뉴스 기사에서 사용자가 반드시 집중해서 읽어야 할 **중요한 구절이나 문장**을 고르는 시스템이다.
     "집중 읽기 모드"에서는 다음 규칙을 따른다:
 
-    1. **기사 원문은 절대 수정하거나 요약하지 말 것.** 출력은 반드시 입력된 원문과 정확히 일치해야 한다.
-    2. 강조는 두 가지 방식으로 할 수 있다:
-    - 문장 전체가 중요하면 **문장 전체를 [[highlight]]...[[/highlight]]로 감싼다**.
-    - 문장 내 특정 구절만 중요하면 해당 **구절만 [[highlight]]...[[/highlight]]로 감싼다**.
+    1. 강조할 구절이나 문장을 **기사 원문에 있는 그대로 한 글자도 바꾸지 말고** 복사한다.
+    2. 문장 전체가 중요하면 문장 전체를, 문장 내 특정 구절만 중요하면 해당 구절만 고른다.
     3. 단, 강조 부분은 적을 수록 좋다. 즉 문장보다 구절 강조가 좋고, 전체 강조 개수도 적어야 한다.
-    4. 전체 강조 수는 **문서 길이에 따라 3~7개 정도로 제한**한다.
+    4. 전체 강조 수는 **문서 길이에 따라 {count}개 정도로 제한**한다.
     5. **강조 여부는 맥락에 따라 유연하게 판단**하며, 인물·단체·기관이 언급된 문장은 강조 대상일 가능성이 높다. 또한, 발언의 시점, 배경, 반론 등 독자의 판단에 영향을 줄 수 있는 문장도 강조 대상이 될 수 있다.
-    6. 강조 이외에는 원문을 그대로 유지하고, 문장 순서나 구조도 변경하지 않는다.
-    7. 강조 마크업 외에는 어떤 텍스트도 추가하지 말고, 오직 원문 전체를 반환할 것.
+    6. 기사에 나오는 순서대로 나열하고, 기사 원문 전체는 다시 출력하지 않는다.
+    7. 출력은 아래 형식의 JSON으로만 한다.
+    {{"highlights": ["강조할 구절", "강조할 문장"]}}
 
     다음은 기사의 원문이다.
-    {article.content}
+    {content}
     '''
 
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {"role": "system", "content": "You are a highlight annotator."},
-            {"role": "user", "content": prompt}
-        ]
-    )
-
-    return response.choices[0].message.content.strip() if response.choices[0].message.content else ""
-
-# Detect bias
-def detect_article_bias(media_name: str, content: str, API_KEY: str) -> dict:
-    from openai import OpenAI
-    import ast
-
-    client = OpenAI(api_key=API_KEY)
-
+    return [
+        {"role": "system", "content": "You are a highlight annotator."},
+        {"role": "user", "content": prompt}
+    ]
+
+# Highlighted phrases of a parsed response
+def highlight_phrases(data: Any) -> List[str]:
+    if isinstance(data, dict):
+        data = data.get("highlights")
+    if not isinstance(data, list):
+        raise ValueError("Highlight response is not a list of phrases.")
+    return [phrase for phrase in data if isinstance(phrase, str)]
+
+# Parse highlights into [start, end) spans of the article content
+def parse_highlight(article: Article, content: str | None) -> List[List[int]]:
+    return resolve_spans(article.content, highlight_phrases(extract_json(content)))
+
+# Keep the complete phrases of a broken highlight response
+def salvage_highlight(article: Article, content: str | None) -> List[List[int]]:
+    try:
+        return resolve_spans(article.content, highlight_phrases(salvage_json(content)))
+    except ValueError:
+        return []
+
+# Generate article highlight spans
+async def generate_highlight_spans(article: Article, API_KEY) -> List[List[int]]:
+    requests = highlight_chunk_messages(article)
+    results = await asyncio.gather(*(
+        complete(
+            "highlight",
+            messages,
+            lambda content: parse_highlight(article, content),
+            API_KEY,
+            salvage=lambda content: salvage_highlight(article, content),
+            response_format={"type": "json_object"}
+        )
+        for messages in requests
+    ))
+    if len(requests) == 1:
+        return results[0]
+
+    print(f"[DEBUG] 긴 기사 강조 {len(requests)}개 구간 병합")
+    return merge_spans(span for spans in results for span in spans or [])
+
+# Highlight prompts of the article, one per chunk of a long article
+def highlight_chunk_messages(article: Article) -> List[list]:
+    chunks = chunk_text(article.content, INPUT_BUDGETS["highlight"])
+    # Spread the 3~7 highlights over the chunks
+    count = "3~7" if len(chunks) == 1 else f"{max(1, 3 // len(chunks))}~{-(-7 // len(chunks))}"
+    return [highlight_messages(article, chunk, count) for chunk in chunks]
+
+# Press leaning labels
+MEDIA_BIASES = ("보수", "진보", "중도")
+
+# Press bias prompt
+def press_bias_messages(media_name: str) -> list:
     prompt = f"""
-    다음은 특정 언론사가 보도한 정치 관련 뉴스 기사입니다.
+    다음 한국 언론사의 일반적인 정치적 성향을 보수, 진보, 중도 중 하나로 판단하세요.
+    널리 알려진 성향이 없거나 판단이 어려우면 "중도"로 답하세요.
 
-    당신의 임무는 이 기사의 **작성 방식**이 해당 언론사의 정치적 성향(보수/진보/중도)에 따라 **눈에 띄게 편향되어 있는지**를 평가하는 것입니다.
+    다음과 같은 형식의 JSON으로만 출력하세요:
+    {{"media_bias": "보수 / 진보 / 중도"}}
 
-    ※ 주의: 다음과 같은 경우에는 반드시 "편향 없음"으로 판단하세요.
-    - 감정적이거나 부정적인 표현이 일부 있어도, 인용문에 기반한 경우
-    - 기자의 서술이 중립적이거나 단순 정보 전달 위주일 경우
-    - 표현이 모호하거나 해석이 갈릴 수 있는 경우
-    - 해당 언론사의 정치 성향과 **연관이 불분명한 구성 또는 주제일 경우**
+    언론사: {media_name}
+    """
 
-    **"편향 있음"으로 판단할 수 있는 유일한 조건은 다음과 같습니다:**
-    - 기자가 직접적으로 특정 정치 성향에 유리하거나 불리하도록 **명확히 서술**하고 있으며,
-    - 그러한 서술이 **여러 문단에 걸쳐 반복적으로 등장**하고,
-    - 그 방향성이 해당 언론사의 정치 성향과 **구체적으로 일치**할 때만 해당합니다.
+    return [
+        {"role": "system", "content": "You are a political bias evaluator."},
+        {"role": "user", "content": prompt}
+    ]
 
-    그 외 모든 경우에는 "편향 없음"으로 판단해야 합니다.
+# Parse press bias
+def parse_press_bias(content: str | None) -> str:
+    media_bias = extract_json(content)["media_bias"].strip()
+    if media_bias not in MEDIA_BIASES:
+        raise ValueError(f"Unknown media bias: {media_bias}")
+    return media_bias
 
-    다음과 같은 형식으로 결과를 출력하세요:
+# Detect press bias
+async def detect_press_bias(media_name: str, API_KEY: str) -> str:
+    return await complete("press_bias", press_bias_messages(media_name), parse_press_bias, API_KEY)
 
-    ```json
-    {{
-    "media_bias": "보수 / 진보 / 중도",
-    "reporting_bias": "있음 / 없음"
-    }}
+# Reporting bias prompt
+def bias_messages(media_name: str, media_bias: str, content: str) -> list:
+    prompt = f"""
+    {media_bias} 성향 언론사({media_name})의 정치 기사입니다.
+    기자가 직접 {media_bias} 성향에 유리하거나 불리하도록 명확히 서술하고, 그런 서술이 여러 문단에 걸쳐 반복될 때만 "있음"입니다.
+    인용문에 기반한 표현, 중립적인 정보 전달, 해석이 갈리는 표현은 모두 "없음"입니다.
+
+    다음과 같은 형식의 JSON으로만 출력하세요:
+    {{"reporting_bias": "있음 / 없음"}}
 
-    언론사: {media_name}
     기사:
     \"\"\"
-    {content}
+    {truncate_to_tokens(content, INPUT_BUDGETS["bias"])}
     \"\"\"
     """
 
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {"role": "system", "content": "You are a political bias evaluator."},
-            {"role": "user", "content": prompt}
-        ]
-    )
+    return [
+        {"role": "system", "content": "You are a political bias evaluator."},
+        {"role": "user", "content": prompt}
+    ]
 
-    content = response.choices[0].message.content.strip().replace("```json", "").replace("```", "") if response.choices[0].message.content else ""
+# Parse reporting bias
+def parse_bias(content: str | None) -> dict:
     try:
-        return ast.literal_eval(content)
+        return {"reporting_bias": extract_json(content)["reporting_bias"]}
     except Exception as e:
         print("[ERROR] Failed to parse bias response:\n", content)
         raise e
+
+# Detect reporting bias
+async def detect_article_bias(media_name: str, media_bias: str, content: str, API_KEY: str) -> dict:
+    return await complete("bias", bias_messages(media_name, media_bias, content), parse_bias, API_KEY)
+
+# Combined prompt, every per-article asset from a single read of the article
+def combined_messages(article: Article) -> list:
+    bias_task = ""
+    # Reporting bias is judged against the press leaning, which is resolved first
+    if article.genre == "정치" and article.press.media_bias:
+        media_bias = article.press.media_bias
+        bias_task = f'''
+4. "bias": {media_bias} 성향 언론사({article.press.name})의 기자가 직접 {media_bias} 성향에 유리하거나 불리하도록 명확히 서술하고,
+   그런 서술이 여러 문단에 걸쳐 반복될 때만 "있음"이고, 그 외에는 모두 "없음"입니다.
+   형식: {{"reporting_bias": "있음 / 없음"}}
+'''
+
+    prompt = f'''
+다음 뉴스 기사 하나로 아래 작업을 모두 수행하고, 결과를 하나의 JSON 객체로만 출력하세요.
+
+1. "chat": 기사의 실제 인물, 단체, 기관만 화자로 하는 대화. 각 인물에는 숫자 형태의 고유 id를 부여하고, 각 발화는 1~2문장,
+   정보의 흐름은 기사 순서를 따릅니다. 키는 순서("1", "2", ...)이고 값은 {{"id": 고유번호, "speaker": 등장인물, "content": 대사}} 입니다.
+2. "narrative": 기사를 현실과 다른 비유적 상황(회사, 마을, 학교, 동물 이야기 등)으로 바꾼 쉬운 한국어 이야기.
+   실제 인물, 단체, 국가 이름과 영어 단어는 쓰지 말고, 사건의 감정 흐름은 유지합니다.
+   형식: {{"narrative": "<비유 본문 내용>", "dictionary": {{"비유용어": "실제용어"}}}}
+3. "highlight": 반드시 집중해서 읽어야 할 구절이나 문장 3~7개를 기사 원문 그대로 복사한 목록. 기사 순서대로 나열하고,
+   문장보다 구절 강조가 좋습니다. 기사 원문 전체는 다시 출력하지 않습니다.
+{bias_task}
+출력 형식:
+{{"chat": {{...}}, "narrative": {{...}}, "highlight": ["...", "..."]{', "bias": {...}' if bias_task else ''}}}
+
+다음은 기사 내용입니다:
+{truncate_to_tokens(article.content, INPUT_BUDGETS["combined"])}
+'''
+
+    return [
+        {"role": "system", "content": "You are a news article assistant that returns JSON only."},
+        {"role": "user", "content": prompt}
+    ]
+
+# Combined assets from a parsed response
+def combined_assets(article: Article, data: dict, partial: bool = False) -> dict:
+    if not isinstance(data, dict):
+        raise ValueError("Combined response is not a JSON object.")
+
+    assets = {"chat": None, "narrative": None, "highlight": None, "bias": None}
+
+    if isinstance(data.get("chat"), dict):
+        assets["chat"] = chat_lines(article, data["chat"], partial) or None
+    if isinstance(data.get("narrative"), (dict, list)):
+        story_summary = parse_narrative(article, json.dumps(data["narrative"], ensure_ascii=False))
+        assets["narrative"] = story_summary if story_summary and story_summary.story else None
+    if isinstance(data.get("highlight"), list):
+        assets["highlight"] = resolve_spans(article.content, highlight_phrases(data["highlight"])) or None
+    if isinstance(data.get("bias"), dict) and "reporting_bias" in data["bias"]:
+        assets["bias"] = {"reporting_bias": data["bias"]["reporting_bias"]}
+
+    if not any(assets.values()):
+        raise ValueError("No assets in combined response.")
+
+    return assets
+
+# Parse combined assets
+def parse_combined(article: Article, content: str | None) -> dict:
+    return combined_assets(article, extract_json(content))
+
+# Keep the complete assets of a broken combined response
+def salvage_combined(article: Article, content: str | None) -> dict | None:
+    try:
+        return combined_assets(article, salvage_json(content), partial=True)
+    except ValueError:
+        return None
+
+# Generate every per-article asset in one call
+async def generate_article_assets(article: Article, API_KEY) -> dict:
+    """
+    Generate chat lines, narrative, highlight and (for 정치 articles) bias
+    with a single structured-output request, so the article body is sent
+    and billed once instead of four times.
+
+    Returns:
+        dict: "chat", "narrative", "highlight" and "bias", None where missing.
+    """
+    return await complete(
+        "combined",
+        combined_messages(article),
+        lambda content: parse_combined(article, content),
+        API_KEY,
+        salvage=lambda content: salvage_combined(article, content),
+        response_format={"type": "json_object"}
+    )
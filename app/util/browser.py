@@ -0,0 +1,195 @@
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Iterator, List
+
+from dotenv import load_dotenv
+from selenium import webdriver
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+from webdriver_manager.chrome import ChromeDriverManager
+
+load_dotenv()
+
+# Browser pool settings
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "4"))
+BROWSER_MAX_PAGES = int(os.getenv("BROWSER_MAX_PAGES", "50"))
+BROWSER_PAGE_TIMEOUT = float(os.getenv("BROWSER_PAGE_TIMEOUT", "10"))
+# Lazy-loaded like/comment counts, missing counts are read as 0 after this
+BROWSER_COUNT_TIMEOUT = float(os.getenv("BROWSER_COUNT_TIMEOUT", "3"))
+CHROMEDRIVER_VERSION = os.getenv("CHROMEDRIVER_VERSION", "136.0.7103.114")
+
+# Selectors of the lazily rendered like/comment counts
+COUNT_SELECTORS = ("span.u_cbox_count", "span._count_num")
+
+_driver_path = None
+_driver_path_lock = threading.Lock()
+
+
+# Download chromedriver once per process
+def chromedriver_path() -> str:
+    global _driver_path
+    with _driver_path_lock:
+        if _driver_path is None:
+            _driver_path = ChromeDriverManager(driver_version=CHROMEDRIVER_VERSION).install()
+    return _driver_path
+
+
+def new_driver() -> webdriver.Chrome:
+    options = Options()
+    options.add_argument("--headless")  # run in background
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    # Images are never read, skip downloading them
+    options.add_argument("--blink-settings=imagesEnabled=false")
+    # Return from get() at DOMContentLoaded, readiness is awaited explicitly
+    options.page_load_strategy = "eager"
+
+    driver = webdriver.Chrome(service=Service(chromedriver_path()), options=options)
+    driver.set_page_load_timeout(BROWSER_PAGE_TIMEOUT)
+    return driver
+
+
+def _counts_rendered(driver) -> bool:
+    # Every count element present on the page has text
+    return driver.execute_script(
+        "return arguments[0].every(function (s) {"
+        "  var el = document.querySelector(s); return !el || el.textContent.trim() !== '';"
+        "});",
+        list(COUNT_SELECTORS),
+    )
+
+
+class PooledDriver:
+    def __init__(self):
+        self.driver = None
+        self.pages = 0
+
+    def get(self) -> webdriver.Chrome:
+        if self.driver is None:
+            self.driver = new_driver()
+            self.pages = 0
+        return self.driver
+
+    def quit(self) -> None:
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception as e:
+                print(f"[DEBUG] 브라우저 종료 실패: {e}")
+        self.driver = None
+        self.pages = 0
+
+
+class BrowserPool:
+    """
+    N long-lived headless Chrome drivers checked out per page.
+
+    Drivers start on first use and are recycled after max_pages pages or
+    as soon as one fails, so a crashed or leaking browser is replaced
+    instead of poisoning the rest of the crawl.
+    """
+
+    def __init__(self, size: int = BROWSER_POOL_SIZE, max_pages: int = BROWSER_MAX_PAGES):
+        self.size = max(1, size)
+        self.max_pages = max_pages
+        self._idle: queue.Queue[PooledDriver] = queue.Queue()
+        for _ in range(self.size):
+            self._idle.put(PooledDriver())
+
+    @contextmanager
+    def checkout(self) -> Iterator[webdriver.Chrome]:
+        slot = self._idle.get()
+        try:
+            yield slot.get()
+        except TimeoutException:
+            # A WebDriverException too, but only the page was slow
+            self._page_done(slot)
+            raise
+        except WebDriverException:
+            # The browser may be dead, start a fresh one next time
+            slot.quit()
+            raise
+        else:
+            self._page_done(slot)
+        finally:
+            self._idle.put(slot)
+
+    # Recycle the driver once it has served max_pages
+    def _page_done(self, slot: PooledDriver) -> None:
+        slot.pages += 1
+        if slot.pages >= self.max_pages:
+            slot.quit()
+
+    def fetch(self, url: str, ready_selector: str | None = "#dic_area") -> str:
+        """
+        Load url and return the rendered HTML once ready_selector is present
+        and the lazy-loaded counts (if on the page) have rendered.
+        """
+        with self.checkout() as driver:
+            try:
+                driver.get(url)
+            except TimeoutException:
+                # Slow third-party assets, the article itself is usually there
+                print(f"[DEBUG] 페이지 로드 시간 초과: {url}")
+
+            wait = WebDriverWait(driver, BROWSER_PAGE_TIMEOUT, poll_frequency=0.05)
+            if ready_selector:
+                wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, ready_selector)))
+
+            # Scroll down to trigger lazy loading, then wait for the counts
+            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            try:
+                WebDriverWait(driver, BROWSER_COUNT_TIMEOUT, poll_frequency=0.05).until(_counts_rendered)
+            except TimeoutException:
+                print(f"[DEBUG] 좋아요/댓글 수 로딩 시간 초과: {url}")
+
+            return driver.page_source
+
+    def fetch_many(self, urls: List[str], ready_selector: str | None = "#dic_area") -> List[str | Exception]:
+        """
+        Fetch urls on all drivers in parallel, returning the HTML or the
+        exception of each url in order.
+        """
+        def fetch(url: str) -> str | Exception:
+            try:
+                return self.fetch(url, ready_selector)
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            return list(executor.map(fetch, urls))
+
+    def close(self) -> None:
+        for _ in range(self.size):
+            self._idle.get().quit()
+        for _ in range(self.size):
+            self._idle.put(PooledDriver())
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+# Shared pool of the process, size only applies when it is created
+def get_browser_pool(size: int = BROWSER_POOL_SIZE) -> BrowserPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool(size)
+    return _pool
+
+
+# Quit the shared pool's browsers, the next get_browser_pool starts a new pool
+def close_browser_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.close()
@@ -0,0 +1,60 @@
+import json
+import re
+
+# Article URLs look like https://n.news.naver.com/article/{oid}/{aid}
+ARTICLE_ID = re.compile(r"/article/(\d+)/(\d+)")
+
+# Lightweight endpoints behind the lazy-loaded like/comment counts.
+#
+# The response formats parsed below are assumed from the requests the
+# article page makes, not checked against captured responses: the bench
+# fixtures are generated by bench/make_fixtures.py in these same formats.
+# That is why the static path using them is off unless SCRAPER_STATIC is
+# set. A response that fails to parse sends the article to the browser, but
+# one that parses under a changed meaning (e.g. reactions other than likes)
+# would give wrong counts unnoticed.
+LIKE_COUNT_URL = "https://news.like.naver.com/v1/search/contents?suppress_response_codes=true&q=NEWS%5Bne_{oid}_{aid}%5D"
+COMMENT_COUNT_URL = (
+    "https://apis.naver.com/commentBox/cbox/web_naver_list_jsonp.json"
+    "?ticket=news&pool=cbox5&lang=ko&country=KR&objectId=news{oid}%2C{aid}&pageSize=1&page=1&_callback=_cbox"
+)
+
+
+# (oid, aid) of an article URL
+def article_ids(url: str) -> tuple[str, str] | None:
+    match = ARTICLE_ID.search(url)
+    return match.groups() if match else None
+
+
+def like_count_url(oid: str, aid: str) -> str:
+    return LIKE_COUNT_URL.format(oid=oid, aid=aid)
+
+
+def comment_count_url(oid: str, aid: str) -> str:
+    return COMMENT_COUNT_URL.format(oid=oid, aid=aid)
+
+
+# Like count shown on the article, assumed to be the sum of all reactions
+# in {"contents": [{"reactions": [{"count": n}, ...]}]}. None for any other
+# shape, rather than a count of 0
+def parse_like_count(text: str) -> int | None:
+    try:
+        reactions = json.loads(text)["contents"][0]["reactions"]
+        return sum(int(reaction["count"]) for reaction in reactions)
+    except (ValueError, LookupError, TypeError) as e:
+        print(f"[DEBUG] 좋아요 수 응답 해석 실패: {e!r}")
+        return None
+
+
+# Comment count from the JSONP comment list, assumed to be
+# _cbox({"success": true, "result": {"count": {"comment": n}}}). None for
+# any other shape or a failed lookup
+def parse_comment_count(text: str) -> int | None:
+    try:
+        data = json.loads(text[text.index("(") + 1:text.rindex(")")])
+        if not data.get("success", True):
+            raise ValueError(data.get("message", "comment count unavailable"))
+        return int(data["result"]["count"]["comment"])
+    except (ValueError, LookupError, TypeError, AttributeError) as e:
+        print(f"[DEBUG] 댓글 수 응답 해석 실패: {e!r}")
+        return None
@@ -0,0 +1,159 @@
+import asyncio
+import os
+import random
+from urllib.parse import urlsplit
+
+import httpx
+from dotenv import load_dotenv
+
+from app.util.http_cache import SCRAPER_CACHE_TTL, HTTPCache, http_cache
+
+load_dotenv()
+
+# Serve every fetch from a local mirror of the site (e.g. bench/serve.py)
+SCRAPER_MIRROR = os.getenv("SCRAPER_MIRROR") or None
+
+# Crawl engine settings
+SCRAPER_TIMEOUT = float(os.getenv("SCRAPER_TIMEOUT", "10"))
+SCRAPER_MAX_CONNECTIONS = int(os.getenv("SCRAPER_MAX_CONNECTIONS", "32"))
+SCRAPER_HOST_CONCURRENCY = int(os.getenv("SCRAPER_HOST_CONCURRENCY", "6"))
+# Minimum seconds between two requests to the same host
+SCRAPER_DELAY = float(os.getenv("SCRAPER_DELAY", "0.05"))
+SCRAPER_RETRIES = int(os.getenv("SCRAPER_RETRIES", "3"))
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'
+}
+
+# Statuses worth retrying
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+# URL actually fetched, https://host/path -> $SCRAPER_MIRROR/host/path
+def resolve_url(url: str) -> str:
+    if SCRAPER_MIRROR and "://" in url:
+        return f"{SCRAPER_MIRROR.rstrip('/')}/{url.split('://', 1)[1]}"
+    return url
+
+
+class AsyncFetcher:
+    """
+    Crawl engine over one pooled httpx.AsyncClient.
+
+    Requests to a host are limited to host_concurrency in flight and start
+    at least delay seconds apart. Connection errors, timeouts, 429 and 5xx
+    are retried with exponential backoff. Limits apply per host of the
+    original URL, also when fetching from a mirror.
+
+    Responses go through the on-disk cache: served as is while younger
+    than the TTL, revalidated with a conditional GET after.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = SCRAPER_MAX_CONNECTIONS,
+        host_concurrency: int = SCRAPER_HOST_CONCURRENCY,
+        delay: float = SCRAPER_DELAY,
+        retries: int = SCRAPER_RETRIES,
+        timeout: float = SCRAPER_TIMEOUT,
+        transport: httpx.AsyncBaseTransport | None = None,
+        cache: HTTPCache | None = http_cache,
+        cache_ttl: float = SCRAPER_CACHE_TTL,
+    ):
+        self.host_concurrency = max(1, host_concurrency)
+        self.delay = delay
+        self.retries = retries
+        self.cache = cache
+        self.cache_ttl = cache_ttl
+        self.client = httpx.AsyncClient(
+            headers=HEADERS,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            follow_redirects=True,
+            transport=transport,
+        )
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+        self._next_start: dict[str, float] = {}
+        self.stats = {"requests": 0, "retries": 0, "errors": 0, "cache_hits": 0, "not_modified": 0}
+
+    async def __aenter__(self) -> "AsyncFetcher":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.client.aclose()
+
+    async def _wait_turn(self, host: str) -> None:
+        # Reserve the next start slot of the host, then sleep until it
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        start = max(now, self._next_start.get(host, 0.0))
+        self._next_start[host] = start + self.delay
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    async def get(self, url: str, referer: str | None = None, ttl: float | None = None) -> str:
+        """
+        Body of url, raising httpx.HTTPError once retries are exhausted.
+        ttl overrides the cache TTL, 0 always revalidates.
+        """
+        fetch_url = resolve_url(url)
+        cached = self.cache.get(fetch_url) if self.cache is not None else None
+        if cached is not None and cached.fresh(self.cache_ttl if ttl is None else ttl):
+            self.stats["cache_hits"] += 1
+            return cached.body
+
+        host = urlsplit(url).netloc
+        semaphore = self._semaphores.setdefault(host, asyncio.Semaphore(self.host_concurrency))
+        headers = cached.validators() if cached is not None else {}
+        if referer:
+            headers["Referer"] = referer
+
+        attempt = 0
+        while True:
+            async with semaphore:
+                await self._wait_turn(host)
+                self.stats["requests"] += 1
+                try:
+                    response = await self.client.get(fetch_url, headers=headers)
+                    if response.status_code == 304 and cached is not None:
+                        self.stats["not_modified"] += 1
+                        self.cache.touch(fetch_url)
+                        return cached.body
+                    if response.status_code not in RETRY_STATUSES:
+                        response.raise_for_status()
+                        if self.cache is not None:
+                            self.cache.set(
+                                fetch_url, response.text,
+                                response.headers.get("etag"), response.headers.get("last-modified"),
+                            )
+                        return response.text
+                    error: httpx.HTTPError = httpx.HTTPStatusError(
+                        f"{response.status_code} for {url}", request=response.request, response=response
+                    )
+                except httpx.TransportError as e:
+                    error = e
+                    response = None
+                except httpx.HTTPError:
+                    self.stats["errors"] += 1
+                    raise
+
+            if attempt >= self.retries:
+                self.stats["errors"] += 1
+                raise error
+            delay = self._backoff(attempt, response)
+            attempt += 1
+            self.stats["retries"] += 1
+            print(f"[CRAWL] {type(error).__name__} {url}, retry {attempt}/{self.retries} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    def _backoff(attempt: int, response: httpx.Response | None) -> float:
+        # Honor Retry-After when the server sends one
+        if response is not None:
+            retry_after = response.headers.get("retry-after")
+            try:
+                if retry_after is not None:
+                    return min(float(retry_after), 30)
+            except ValueError:
+                pass
+        return min(0.5 * 2 ** attempt, 10) * (0.5 + random.random())
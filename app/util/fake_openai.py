@@ -0,0 +1,254 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import time
+import uuid
+from collections import Counter
+from typing import Callable, List
+
+from dotenv import load_dotenv
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.util.jsonstream import salvage_json
+from app.util.tokens import count_message_tokens, count_tokens, split_sentences
+
+load_dotenv()
+
+# Fake server settings
+FAKE_OPENAI_LATENCY = os.getenv("FAKE_OPENAI_LATENCY", "fixed:0")
+FAKE_OPENAI_TOKEN_LATENCY = float(os.getenv("FAKE_OPENAI_TOKEN_LATENCY", "0"))
+FAKE_OPENAI_ERROR_RATE = float(os.getenv("FAKE_OPENAI_ERROR_RATE", "0"))
+FAKE_OPENAI_TRUNCATE_RATE = float(os.getenv("FAKE_OPENAI_TRUNCATE_RATE", "0"))
+FAKE_OPENAI_SEED = int(os.getenv("FAKE_OPENAI_SEED", "0"))
+
+# Text right before the article body in each prompt of app/util/AI.py
+ARTICLE_MARKERS = ("이루어져있습니다.", "다음은 기사 내용입니다:", "다음은 기사의 원문이다.", '기사:\n    """')
+# Header of the title list in the keyword prompt, the bullets above it are instructions
+TITLES_MARKER = "기사 제목 목록:"
+
+MEDIA_BIASES = ("보수", "진보", "중도")
+
+
+# Parse a latency spec: fixed:S, uniform:LO,HI or lognormal:MEDIAN,SIGMA (seconds)
+def latency_sampler(spec: str, rng: random.Random) -> Callable[[], float]:
+    name, _, args = spec.partition(":")
+    values = [float(value) for value in args.split(",") if value]
+    if name == "fixed":
+        return lambda: values[0] if values else 0.0
+    if name == "uniform":
+        return lambda: rng.uniform(values[0], values[1])
+    if name == "lognormal":
+        return lambda: rng.lognormvariate(math.log(values[0]), values[1])
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+def _article(prompt: str) -> str:
+    for marker in ARTICLE_MARKERS:
+        if marker in prompt:
+            prompt = prompt.rsplit(marker, 1)[1]
+            break
+    return prompt.split('"""')[0].strip()
+
+
+def _sentences(article: str) -> List[str]:
+    return [sentence.strip() for sentence in split_sentences(article) if len(sentence.strip()) > 10]
+
+
+def _chat(article: str, rng: random.Random) -> dict:
+    speakers = ["기자", "관계자", "전문가"]
+    lines = {}
+    for order, sentence in enumerate(_sentences(article)[:6], start=1):
+        speaker = rng.randrange(len(speakers))
+        lines[str(order)] = {"id": speaker + 1, "speaker": speakers[speaker], "content": sentence[:80]}
+    return lines or {"1": {"id": 1, "speaker": "기자", "content": article[:80] or "내용이 없습니다."}}
+
+
+def _narrative(article: str, rng: random.Random) -> list:
+    sentences = _sentences(article)[:3]
+    return [{
+        "narrative": " ".join(f"어느 마을에서 {sentence[:40]}" for sentence in sentences) or "어느 마을 이야기입니다.",
+        "dictionary": {"마을": "국가", "이장": "대통령"},
+    }]
+
+
+def _highlights(article: str, rng: random.Random) -> List[str]:
+    sentences = _sentences(article)
+    picked = sorted(rng.sample(range(len(sentences)), min(3, len(sentences))))
+    # Exact fragments, so they resolve to spans of the article
+    return [sentences[index][:30].strip() for index in picked]
+
+
+def _keywords(prompt: str) -> dict:
+    titles = [line[2:] for line in prompt.rsplit(TITLES_MARKER, 1)[-1].splitlines() if line.startswith("- ")]
+    words = Counter(
+        word for title in titles
+        for word in re.findall(r"[가-힣A-Za-z0-9]{2,}", title)
+    )
+    top = [word for word, _ in words.most_common(5)] or ["뉴스"]
+    return {"keywords": [{"keyword": word, "score": str(5 - rank)} for rank, word in enumerate(top)]}
+
+
+# Canned completion in the format the matching parser expects
+def fake_completion(messages: list) -> str:
+    system = messages[0]["content"] if messages else ""
+    prompt = messages[-1]["content"] if messages else ""
+    # Same prompt, same answer
+    rng = random.Random(hashlib.sha256(json.dumps(messages, ensure_ascii=False).encode("utf-8")).digest())
+
+    if len(messages) > 2 and messages[-2]["role"] == "assistant":
+        # Continuation of a truncated response, the rest of the same answer
+        partial = messages[-2]["content"]
+        full = fake_completion(messages[:-2])
+        return full[len(partial):] if full.startswith(partial) else ""
+    if "repair" in system:
+        return json.dumps(salvage_json(prompt.split("\n\n", 1)[-1]) or {}, ensure_ascii=False)
+
+    article = _article(prompt)
+    if "conversation" in system:
+        result = _chat(article, rng)
+    elif "narrative" in system:
+        result = _narrative(article, rng)
+    elif "topic analyst" in system:
+        result = _keywords(prompt)
+    elif "highlight" in system:
+        result = {"highlights": _highlights(article, rng)}
+    elif "bias" in system and "reporting_bias" not in prompt:
+        press = prompt.rsplit("언론사:", 1)[-1].strip()
+        result = {"media_bias": MEDIA_BIASES[int(hashlib.sha256(press.encode("utf-8")).hexdigest(), 16) % 3]}
+    elif "bias" in system:
+        result = {"reporting_bias": rng.choice(["없음", "없음", "없음", "있음"])}
+    elif "JSON only" in system:
+        result = {
+            "chat": _chat(article, rng),
+            "narrative": _narrative(article, rng)[0],
+            "highlight": _highlights(article, rng),
+        }
+        if "reporting_bias" in prompt:
+            result["bias"] = {"reporting_bias": rng.choice(["없음", "있음"])}
+    else:
+        result = {"message": "fake response"}
+
+    return json.dumps(result, ensure_ascii=False)
+
+
+def create_app(
+    latency: str = FAKE_OPENAI_LATENCY,
+    token_latency: float = FAKE_OPENAI_TOKEN_LATENCY,
+    error_rate: float = FAKE_OPENAI_ERROR_RATE,
+    truncate_rate: float = FAKE_OPENAI_TRUNCATE_RATE,
+    seed: int = FAKE_OPENAI_SEED,
+) -> FastAPI:
+    """
+    OpenAI-compatible /v1/chat/completions serving canned responses.
+
+    Each request waits a sampled latency plus token_latency per completion
+    token. error_rate of requests fail with 429 or 500 and truncate_rate
+    are cut in half with finish_reason "length". Streaming is supported.
+    """
+    rng = random.Random(seed)
+    sample_latency = latency_sampler(latency, rng)
+    app = FastAPI(title="Fake OpenAI")
+    app.state.requests = 0
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.requests += 1
+        messages = body.get("messages", [])
+
+        await asyncio.sleep(sample_latency())
+
+        if rng.random() < error_rate:
+            if rng.random() < 0.5:
+                return JSONResponse(
+                    {"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}},
+                    status_code=429,
+                    headers={"retry-after": "0.1"},
+                )
+            return JSONResponse({"error": {"message": "The server had an error", "type": "server_error"}}, status_code=500)
+
+        content = fake_completion(messages)
+        finish_reason = "stop"
+        if rng.random() < truncate_rate:
+            content = content[:len(content) // 2]
+            finish_reason = "length"
+
+        usage = {
+            "prompt_tokens": count_message_tokens(messages),
+            "completion_tokens": count_tokens(content),
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        model = body.get("model", "fake")
+
+        if not body.get("stream"):
+            await asyncio.sleep(token_latency * usage["completion_tokens"])
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": finish_reason}],
+                "usage": usage,
+            }
+
+        include_usage = (body.get("stream_options") or {}).get("include_usage", False)
+
+        def event(delta: dict, reason: str | None = None, chunk_usage: dict | None = None) -> str:
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": reason}] if chunk_usage is None else [],
+            }
+            if chunk_usage is not None:
+                chunk["usage"] = chunk_usage
+            return f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+
+        async def stream():
+            yield event({"role": "assistant", "content": ""})
+            for start in range(0, len(content), 8):
+                piece = content[start:start + 8]
+                await asyncio.sleep(token_latency * count_tokens(piece))
+                yield event({"content": piece})
+            yield event({}, finish_reason)
+            if include_usage:
+                yield event({}, chunk_usage=usage)
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fake OpenAI chat-completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", default=FAKE_OPENAI_LATENCY, help="fixed:S | uniform:LO,HI | lognormal:MEDIAN,SIGMA")
+    parser.add_argument("--token-latency", type=float, default=FAKE_OPENAI_TOKEN_LATENCY, help="seconds per completion token")
+    parser.add_argument("--error-rate", type=float, default=FAKE_OPENAI_ERROR_RATE)
+    parser.add_argument("--truncate-rate", type=float, default=FAKE_OPENAI_TRUNCATE_RATE)
+    parser.add_argument("--seed", type=int, default=FAKE_OPENAI_SEED)
+    args = parser.parse_args()
+
+    import uvicorn
+    uvicorn.run(
+        create_app(args.latency, args.token_latency, args.error_rate, args.truncate_rate, args.seed),
+        host=args.host,
+        port=args.port,
+        log_level="warning",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import re
+from typing import Iterable, List
+
+HIGHLIGHT_OPEN = "[[highlight]]"
+HIGHLIGHT_CLOSE = "[[/highlight]]"
+
+
+# Find a phrase in the article, tolerating whitespace differences
+def _find(content: str, phrase: str, start: int) -> tuple[int, int] | None:
+    index = content.find(phrase, start)
+    if index >= 0:
+        return index, index + len(phrase)
+
+    words = phrase.split()
+    if not words:
+        return None
+    match = re.compile(r"\s+".join(map(re.escape, words))).search(content, start)
+    if match:
+        return match.start(), match.end()
+    return None
+
+
+# Resolve highlighted phrases to [start, end) offsets into the article
+def resolve_spans(content: str, phrases: Iterable[str]) -> List[List[int]]:
+    """
+    Phrases are searched after the previous match first, since the model
+    lists them in article order, then from the top. Phrases that do not occur
+    in the article are dropped and overlapping spans are merged.
+    """
+    spans = []
+    cursor = 0
+    for phrase in phrases:
+        phrase = phrase.strip() if isinstance(phrase, str) else ""
+        if not phrase:
+            continue
+        found = _find(content, phrase, cursor) or _find(content, phrase, 0)
+        if found is None:
+            print(f"[DEBUG] 강조 구절을 원문에서 찾지 못함: {phrase[:30]}")
+            continue
+        spans.append(list(found))
+        cursor = found[1]
+
+    return merge_spans(spans)
+
+
+# Sort spans and merge the overlapping ones
+def merge_spans(spans: Iterable[Iterable[int]]) -> List[List[int]]:
+    merged: List[List[int]] = []
+    for start, end in sorted(list(span) for span in spans):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+# Wrap each span of the article in highlight markers
+def render_highlight(content: str, spans: Iterable[Iterable[int]]) -> str:
+    parts = []
+    cursor = 0
+    for start, end in spans:
+        parts.append(content[cursor:start])
+        parts.append(HIGHLIGHT_OPEN + content[start:end] + HIGHLIGHT_CLOSE)
+        cursor = end
+    parts.append(content[cursor:])
+    return "".join(parts)
@@ -0,0 +1,126 @@
+import os
+import sqlite3
+import threading
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Kept across crawls, like the LLM cache
+SCRAPER_CACHE_PATH = os.getenv("SCRAPER_CACHE_PATH", "scraper_cache.sqlite3")
+# Seconds a cached page is used without asking the server, revalidated after
+SCRAPER_CACHE_TTL = float(os.getenv("SCRAPER_CACHE_TTL", "3600"))
+# Seconds a memoized press name/logo is used without fetching its page
+SCRAPER_PRESS_TTL = float(os.getenv("SCRAPER_PRESS_TTL", str(7 * 24 * 3600)))
+
+
+class CachedResponse:
+    def __init__(self, body: str, etag: str | None, last_modified: str | None, fetched_at: float):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+
+    def fresh(self, ttl: float) -> bool:
+        return time.time() - self.fetched_at < ttl
+
+    # Conditional GET headers to revalidate this response
+    def validators(self) -> dict:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HTTPCache:
+    """
+    On-disk cache of scraper responses keyed by URL, plus press metadata
+    memoized by press_id.
+
+    Responses are served without a request while younger than the TTL and
+    revalidated with their ETag/Last-Modified after, so unchanged pages
+    cost a 304 instead of a download.
+    """
+
+    def __init__(self, path: str = SCRAPER_CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            # A lost write only costs a refetch, skip the fsync per response
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    url TEXT PRIMARY KEY,
+                    body TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    fetched_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS presses (
+                    press_id TEXT PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    logo TEXT,
+                    fetched_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.commit()
+        return self._conn
+
+    def get(self, url: str) -> CachedResponse | None:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT body, etag, last_modified, fetched_at FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+        return CachedResponse(*row) if row else None
+
+    def set(self, url: str, body: str, etag: str | None, last_modified: str | None) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (url, body, etag, last_modified, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                (url, body, etag, last_modified, time.time())
+            )
+            conn.commit()
+
+    # A 304 confirmed the cached body, restart its TTL
+    def touch(self, url: str) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute("UPDATE responses SET fetched_at = ? WHERE url = ?", (time.time(), url))
+            conn.commit()
+
+    def get_press(self, press_id: str, ttl: float = SCRAPER_PRESS_TTL) -> tuple | None:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT name, logo, fetched_at FROM presses WHERE press_id = ?", (press_id,)
+            ).fetchone()
+        if row is None or time.time() - row[2] >= ttl:
+            return None
+        return (press_id, row[0], row[1])
+
+    def set_press(self, press_id: str, name: str, logo: str | None) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO presses (press_id, name, logo, fetched_at) VALUES (?, ?, ?, ?)",
+                (press_id, name, logo, time.time())
+            )
+            conn.commit()
+
+
+# Disabled with SCRAPER_CACHE_PATH=
+http_cache = HTTPCache() if SCRAPER_CACHE_PATH else None
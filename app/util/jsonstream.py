@@ -0,0 +1,181 @@
+import ast
+import json
+import re
+from typing import Any, List, Tuple
+
+CLOSERS = {"{": "}", "[": "]"}
+
+
+# Parse a JSON (or Python literal) fragment as the model may emit either
+def parse_literal(text: str) -> Any:
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return ast.literal_eval(text)
+
+
+# Scan the first JSON value in text
+def _scan(text: str) -> Tuple[int, int | None, List[Tuple[int, str]]]:
+    """
+    Return (start, end, cuts) of the first top-level object or array.
+
+    end is None when the value is truncated. cuts are (position, closers)
+    pairs where the text up to position is a complete prefix that parses
+    once closers are appended: after an opener, before a comma and after a
+    closed container.
+    """
+    start = min((i for i in (text.find("{"), text.find("[")) if i >= 0), default=-1)
+    if start < 0:
+        raise ValueError("No JSON object in response.")
+
+    stack = []
+    cuts = []
+    quote = None
+    escaped = False
+    for pos in range(start, len(text)):
+        char = text[pos]
+        if quote:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == quote:
+                quote = None
+        elif char in ('"', "'"):
+            quote = char
+        elif char in "{[":
+            stack.append(CLOSERS[char])
+            cuts.append((pos + 1, "".join(reversed(stack))))
+        elif char in "}]":
+            if not stack or stack.pop() != char:
+                raise ValueError(f"Unbalanced {char!r} at {pos}.")
+            if not stack:
+                return start, pos + 1, cuts
+            cuts.append((pos + 1, "".join(reversed(stack))))
+        elif char == ",":
+            cuts.append((pos, "".join(reversed(stack))))
+
+    return start, None, cuts
+
+
+# Drop code fences around a response
+def strip_fences(text: str) -> str:
+    return re.sub(r"```(?:json)?\n?", "", text).replace("```", "").strip()
+
+
+# Extract the first complete JSON value of a model response
+def extract_json(text: str | None) -> Any:
+    """
+    Tolerates code fences, prose before the value and trailing text after
+    it. Raises ValueError on truncated or malformed output.
+    """
+    if not text:
+        raise ValueError("No content received from OpenAI.")
+
+    text = strip_fences(text)
+    start, end, _ = _scan(text)
+    if end is None:
+        raise ValueError("Truncated JSON in response.")
+    try:
+        return parse_literal(text[start:end])
+    except (ValueError, SyntaxError) as e:
+        raise ValueError(f"Malformed JSON in response: {e}") from e
+
+
+# Salvage the complete members of a truncated or malformed response
+def salvage_json(text: str | None) -> Any:
+    """
+    Cut the value back to the longest prefix that parses once its open
+    containers are closed, dropping any half-written member. Returns None
+    when nothing can be recovered.
+    """
+    if not text:
+        return None
+
+    text = strip_fences(text)
+    try:
+        start, end, cuts = _scan(text)
+    except ValueError:
+        return None
+    if end is not None:
+        try:
+            return parse_literal(text[start:end])
+        except (ValueError, SyntaxError):
+            pass
+
+    for position, closers in reversed(cuts):
+        try:
+            return parse_literal(text[start:position] + closers)
+        except (ValueError, SyntaxError):
+            continue
+    return None
+
+
+class ObjectMemberStream:
+    """
+    Incrementally parse the members of a top-level JSON object.
+
+    Feed text chunks as they arrive; every member whose value has been closed
+    is returned as a (key, value) pair. Text before the first "{" (such as a
+    code fence) is ignored.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._quote = None
+        self._escaped = False
+        self._member_start = None
+        self.done = False
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        self._buffer += chunk
+        members = []
+
+        while self._pos < len(self._buffer) and not self.done:
+            char = self._buffer[self._pos]
+
+            if self._quote:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == self._quote:
+                    self._quote = None
+            elif self._depth > 0 and char in ('"', "'"):
+                self._quote = char
+            elif char in "{[":
+                self._depth += 1
+                if self._depth == 1:
+                    self._member_start = self._pos + 1
+            elif char in "}]":
+                if self._depth == 1:
+                    members.extend(self._close_member(self._pos))
+                    self.done = True
+                self._depth -= 1
+                if self._depth == 1:
+                    members.extend(self._close_member(self._pos + 1))
+            elif char == "," and self._depth == 1:
+                members.extend(self._close_member(self._pos))
+                self._member_start = self._pos + 1
+
+            self._pos += 1
+
+        return members
+
+    def _close_member(self, end: int) -> List[Tuple[str, Any]]:
+        if self._member_start is None:
+            return []
+
+        text = self._buffer[self._member_start:end].strip().strip(",")
+        self._member_start = end
+        if not text:
+            return []
+
+        try:
+            member = parse_literal("{" + text + "}")
+        except (ValueError, SyntaxError):
+            return []
+
+        return list(member.items())
@@ -0,0 +1,282 @@
+import asyncio
+import os
+import random
+import time
+
+import httpx
+import openai
+from dotenv import load_dotenv
+from openai import AsyncOpenAI
+
+from app.core import metrics
+from app.util.tokens import count_message_tokens
+
+load_dotenv()
+
+# Client settings
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+
+# Serve every request from the in-process fake server (app/util/fake_openai.py)
+LLM_FAKE = os.getenv("LLM_FAKE", "false").lower() == "true"
+
+# Global budget per minute
+LLM_RPM = int(os.getenv("LLM_RPM", "500"))
+LLM_TPM = int(os.getenv("LLM_TPM", "200000"))
+
+# Completion tokens reserved per request until the real usage is known
+COMPLETION_TOKEN_RESERVE = 1000
+
+# Errors worth retrying (429, 5xx, timeouts, dropped connections)
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.InternalServerError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+)
+
+
+# Token estimate of a chat request, prompt plus reserved completion
+def estimate_tokens(messages: list) -> int:
+    return count_message_tokens(messages) + COMPLETION_TOKEN_RESERVE
+
+
+# Record the token usage OpenAI reported for a request
+def record_usage(kind: str, usage) -> None:
+    if usage is None:
+        return
+    metrics.llm_prompt_tokens.inc(usage.prompt_tokens or 0, kind=kind)
+    metrics.llm_completion_tokens.inc(usage.completion_tokens or 0, kind=kind)
+    metrics.llm_request_tokens.observe(usage.total_tokens or 0, kind=kind)
+
+
+class RateBudget:
+    """
+    Requests- and tokens-per-minute budget with a FIFO wait queue.
+
+    Both budgets refill continuously. Callers wait in arrival order until
+    both have room for their request.
+    """
+
+    def __init__(self, rpm: int = LLM_RPM, tpm: int = LLM_TPM):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = float(rpm)
+        self._tokens = float(tpm)
+        self._updated = time.monotonic()
+        self._lock = None
+        self._loop = None
+        self.waiting = 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+        self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+
+    async def acquire(self, tokens: int) -> float:
+        """
+        Wait for room in the budget and return the seconds spent waiting.
+        """
+        tokens = min(tokens, self.tpm)
+        started = time.monotonic()
+
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._lock = asyncio.Lock()
+            self._loop = loop
+
+        self.waiting += 1
+        try:
+            async with self._lock:
+                while True:
+                    self._refill()
+                    if self._requests >= 1 and self._tokens >= tokens:
+                        self._requests -= 1
+                        self._tokens -= tokens
+                        break
+                    wait = max(
+                        (1 - self._requests) * 60 / self.rpm,
+                        (tokens - self._tokens) * 60 / self.tpm,
+                    )
+                    await asyncio.sleep(max(wait, 0.01))
+        finally:
+            self.waiting -= 1
+        return time.monotonic() - started
+
+    def adjust(self, tokens: int) -> None:
+        """
+        Correct the token budget once the real usage is known.
+        """
+        self._tokens = min(self.tpm, self._tokens - tokens)
+
+
+class LLMClient:
+    """
+    Shared OpenAI client with keep-alive connection pooling, per-call
+    timeouts, exponential backoff on 429/5xx and a global rate budget.
+    """
+
+    def __init__(
+        self,
+        api_key: str | None,
+        base_url: str | None = OPENAI_BASE_URL,
+        timeout: float = LLM_TIMEOUT,
+        max_retries: int = LLM_MAX_RETRIES,
+        max_connections: int = LLM_MAX_CONNECTIONS,
+        budget: RateBudget | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.transport = transport
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.max_connections = max_connections
+        self.budget = budget or RateBudget()
+        self._client = None
+        self._loop = None
+
+        self.stats = {
+            "requests": 0,
+            "retries": 0,
+            "errors": 0,
+            "in_flight": 0,
+            "wait_seconds_total": 0.0,
+            "last_wait_seconds": 0.0,
+        }
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        # httpx connections are bound to the event loop that opened them
+        loop = asyncio.get_running_loop()
+        if self._client is not None and self._loop is not loop:
+            self._discard()
+        if self._client is None:
+            self._client = AsyncOpenAI(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                max_retries=0,
+                http_client=httpx.AsyncClient(
+                    transport=self.transport,
+                    limits=httpx.Limits(
+                        max_connections=self.max_connections,
+                        max_keepalive_connections=self.max_connections,
+                    ),
+                    timeout=httpx.Timeout(self.timeout, connect=10),
+                ),
+            )
+            self._loop = loop
+        return self._client
+
+    def _discard(self) -> None:
+        client, loop = self._client, self._loop
+        self._client = self._loop = None
+        if loop.is_running():
+            # Still serving another thread, close the client there
+            asyncio.run_coroutine_threadsafe(client.close(), loop)
+        else:
+            # A finished loop can no longer close its connections, it should
+            # have called aclose() before it ended
+            print("[LLM] client of a finished event loop dropped without closing")
+
+    async def aclose(self) -> None:
+        """
+        Close the pooled connections, on the event loop that opened them.
+        """
+        if self._client is not None and self._loop is asyncio.get_running_loop():
+            client, self._client, self._loop = self._client, None, None
+            await client.close()
+
+    @property
+    def queue_depth(self) -> int:
+        return self.budget.waiting
+
+    def snapshot(self) -> dict:
+        return {**self.stats, "queue_depth": self.queue_depth}
+
+    async def create(self, kind: str = "other", **kwargs):
+        """
+        client.chat.completions.create with budget, timeout and retries.
+        kind labels the request in the metrics.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        estimated = estimate_tokens(kwargs.get("messages", []))
+
+        attempt = 0
+        while True:
+            wait = await self.budget.acquire(estimated)
+            self.stats["wait_seconds_total"] += wait
+            self.stats["last_wait_seconds"] = wait
+            self.stats["requests"] += 1
+            self.stats["in_flight"] += 1
+            metrics.llm_requests.inc(kind=kind)
+            started = time.monotonic()
+            try:
+                response = await self.client.chat.completions.create(**kwargs)
+            except RETRYABLE_ERRORS as e:
+                if attempt >= self.max_retries:
+                    self.stats["errors"] += 1
+                    metrics.llm_errors.inc(kind=kind)
+                    raise
+                delay = self._backoff(attempt, e)
+                attempt += 1
+                self.stats["retries"] += 1
+                metrics.llm_retries.inc(kind=kind)
+                print(f"[LLM] {type(e).__name__}, retry {attempt}/{self.max_retries} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+            except Exception:
+                self.stats["errors"] += 1
+                metrics.llm_errors.inc(kind=kind)
+                raise
+            finally:
+                self.stats["in_flight"] -= 1
+
+            # Streams return here once the response starts, usage comes with the last chunk
+            metrics.llm_request_seconds.observe(time.monotonic() - started, kind=kind)
+            usage = getattr(response, "usage", None)
+            if usage is not None and usage.total_tokens:
+                self.budget.adjust(usage.total_tokens - estimated)
+                record_usage(kind, usage)
+            return response
+
+    @staticmethod
+    def _backoff(attempt: int, error: Exception) -> float:
+        # Honor Retry-After when the server sends one
+        response = getattr(error, "response", None)
+        if response is not None:
+            retry_after = response.headers.get("retry-after")
+            try:
+                if retry_after is not None:
+                    return min(float(retry_after), 60)
+            except ValueError:
+                pass
+        return min(0.5 * 2 ** attempt, 20) * (0.5 + random.random())
+
+
+_clients: dict[str | None, LLMClient] = {}
+
+
+# Shared client per API key
+def get_llm_client(api_key: str | None) -> LLMClient:
+    if api_key not in _clients:
+        if LLM_FAKE:
+            from app.util.fake_openai import create_app
+            _clients[api_key] = LLMClient(
+                api_key or "fake",
+                base_url="http://fake-openai/v1",
+                transport=httpx.ASGITransport(app=create_app()),
+            )
+        else:
+            _clients[api_key] = LLMClient(api_key)
+    return _clients[api_key]
+
+
+# Close every shared client opened on the running event loop, before it ends
+async def close_llm_clients() -> None:
+    for client in list(_clients.values()):
+        await client.aclose()
@@ -0,0 +1,108 @@
+import os
+
+import soupsieve as sv
+from bs4 import BeautifulSoup
+from bs4.filter import ElementFilter
+
+try:
+    import lxml  # noqa: F401
+except ImportError:
+    lxml = None
+
+# Tree builder of the scraper, lxml when installed
+SCRAPER_PARSER = os.getenv("SCRAPER_PARSER") or ("lxml" if lxml is not None else "html.parser")
+# Build only the nodes the scraper reads instead of the whole page. Off by
+# default: the node rules are only checked against the synthetic bench pages
+SCRAPER_STRAIN = os.getenv("SCRAPER_STRAIN", "false").lower() == "true"
+
+# (tag, attribute, value) of the nodes read from each page kind. Classes
+# match one of the class names, hrefs a substring, other attributes exactly
+PAGE_NODES = {
+    "ranking": [
+        ("a", "class", "rankingnews_box_head"),
+        ("ul", "class", "rankingnews_list"),
+    ],
+    "press": [
+        ("a", "class", "press_hd_ci_image"),
+        ("h3", "class", "press_hd_name"),
+    ],
+    "article": [
+        ("article", "id", "dic_area"),
+        ("span", "class", "_ARTICLE_DATE_TIME"),
+        ("span", "class", "_ARTICLE_MODIFY_DATE_TIME"),
+        ("span", "class", "u_cbox_count"),
+        ("span", "class", "_count_num"),
+        ("a", "class", "Nitem_link"),
+        # Journalist card, the author name and id. Only checked against the
+        # synthetic bench pages, real cards may link elsewhere
+        ("a", "href", "/journalist/"),
+    ],
+}
+
+# Selectors run on every page, compiled once
+RANKING_ITEMS = sv.compile("ul.rankingnews_list > li")
+RANKING_NUMBER = sv.compile("em.list_ranking_num")
+RANKING_TITLE = sv.compile("div.list_content > a.list_title")
+ARTICLE_IMAGE_NODES = sv.compile("em.img_desc, span.end_photo_org")
+ARTICLE_DATE = sv.compile("span._ARTICLE_DATE_TIME")
+ARTICLE_MODIFY_DATE = sv.compile("span._ARTICLE_MODIFY_DATE_TIME")
+COMMENT_COUNT = sv.compile("span.u_cbox_count")
+LIKE_COUNT = sv.compile("span._count_num")
+
+# Present in the static HTML of every article page
+ARTICLE_REQUIRED = [
+    sv.compile("article#dic_area"),
+    ARTICLE_DATE,
+    sv.compile("em.media_journalistcard_summary_name_text"),
+]
+
+
+def _matches(attr: str, expected: str, value: str | None) -> bool:
+    if value is None:
+        return False
+    if attr == "class":
+        return expected in value.split()
+    if attr == "href":
+        return expected in value
+    return value == expected
+
+
+class NodeFilter(ElementFilter):
+    """
+    parse_only filter keeping the top-most tags matching one of the
+    (tag, attribute, value) rules, together with their subtrees.
+    Everything else is dropped while parsing and never becomes a node.
+    """
+
+    def __init__(self, nodes: list):
+        self.nodes = nodes
+
+    def allow_tag_creation(self, nsprefix, name, attrs) -> bool:
+        attrs = attrs or {}
+        return any(
+            name == tag and _matches(attr, expected, attrs.get(attr))
+            for tag, attr, expected in self.nodes
+        )
+
+    def allow_string_creation(self, string) -> bool:
+        # Text outside the kept tags is never read
+        return False
+
+
+PAGE_FILTERS = {kind: NodeFilter(nodes) for kind, nodes in PAGE_NODES.items()}
+
+
+# Nodes a parsed page of the kind must contain
+PAGE_REQUIRED = {"article": ARTICLE_REQUIRED}
+
+
+# Parse a page, keeping only the nodes read from its kind when straining
+def parse_page(html: str, kind: str | None = None, parser: str = SCRAPER_PARSER, strain: bool = SCRAPER_STRAIN) -> BeautifulSoup:
+    if not (strain and kind):
+        return BeautifulSoup(html, parser)
+
+    soup = BeautifulSoup(html, parser, parse_only=PAGE_FILTERS[kind])
+    # The filters are unproven on real markup, never let them lose a node
+    if any(selector.select_one(soup) is None for selector in PAGE_REQUIRED.get(kind, [])):
+        soup = BeautifulSoup(html, parser)
+    return soup
@@ -1,119 +1,270 @@
-import requests as _requests
 import bs4 as _bs4
 from bs4.element import Tag
-from typing import cast
+from typing import List, cast
+import asyncio
 import json
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.options import Options
+import os
+from concurrent.futures import ThreadPoolExecutor
 from bs4 import BeautifulSoup
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.action_chains import ActionChains
-from selenium.webdriver.common.by import By
-import time
+from app.util.browser import close_browser_pool, get_browser_pool
+from app.util.counts import article_ids, comment_count_url, like_count_url, parse_comment_count, parse_like_count
+from app.util.crawler import AsyncFetcher, resolve_url
+from app.util.parsing import (
+    ARTICLE_DATE, ARTICLE_IMAGE_NODES, ARTICLE_MODIFY_DATE, ARTICLE_REQUIRED, COMMENT_COUNT, LIKE_COUNT,
+    RANKING_ITEMS, RANKING_NUMBER, RANKING_TITLE, parse_page,
+)
+
+# Fetch articles over plain HTTP first, the browser only for what is missing.
+# Off by default: the count endpoint formats are not checked against real responses
+SCRAPER_STATIC = os.getenv("SCRAPER_STATIC", "false").lower() == "true"
+
+RANKING_URL = "https://news.naver.com/main/ranking/popularDay.naver"
 
 # Get article html for dynamically loaded elements
 def get_dynamic_article_html(url: str) -> BeautifulSoup:
-    options = Options()
-    options.add_argument("--headless")  # run in background
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
+    html = get_browser_pool().fetch(resolve_url(url))
+    return parse_page(html, "article")
+
+# Get article soups for many urls on the browser pool in parallel
+def get_dynamic_article_htmls(urls: List[str]) -> List[BeautifulSoup | None]:
+    soups = []
+    for url, html in zip(urls, get_browser_pool().fetch_many([resolve_url(url) for url in urls])):
+        if isinstance(html, Exception):
+            print("Error loading page:", url, html)
+            soups.append(None)
+        else:
+            soups.append(parse_page(html, "article"))
+    return soups
 
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager(driver_version="136.0.7103.114").install()), options=options)
-    driver.get(url)
+# Get soup from link
+async def parse_html_from_link(fetcher: AsyncFetcher, url: str, kind: str | None = None, ttl: float | None = None) -> _bs4.BeautifulSoup:
+    """
+    Parses the HTML content and returns a BeautifulSoup object.
+    kind ("ranking", "press" or "article") keeps only the nodes read from it.
+    """
+    html = await fetcher.get(url, ttl=ttl)
+    soup = parse_page(html, kind)
+    return soup
 
+# Get (like, comment) counts of an article from their endpoints
+async def fetch_counts(fetcher: AsyncFetcher, url: str) -> tuple[int, int] | None:
+    ids = article_ids(url)
+    if ids is None:
+        return None
     try:
-        # Wait for body/article to appear
-        WebDriverWait(driver, 2).until(
-            EC.presence_of_element_located((By.TAG_NAME, "body"))
+        like_text, comment_text = await asyncio.gather(
+            fetcher.get(like_count_url(*ids), referer=url, ttl=0),
+            fetcher.get(comment_count_url(*ids), referer=url, ttl=0),
         )
-
-        # Scroll down to trigger lazy image load
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(1)
-
-        # Now re-parse the rendered page
-        html = driver.page_source
-        soup = BeautifulSoup(html, "html.parser")
-        driver.quit()
-        return soup
-
     except Exception as e:
-        print("Error loading page:", e)
-        driver.quit()
-        raise 
-
-# Get soup from link
-def parse_html_from_link(url: str) -> _bs4.BeautifulSoup:
+        print(f"[DEBUG] 좋아요/댓글 수 조회 실패: {url} {e}")
+        return None
+
+    like_count, comment_count = parse_like_count(like_text), parse_comment_count(comment_text)
+    if like_count is None or comment_count is None:
+        # Rendered in the browser instead of scored from a misread count
+        print(f"[DEBUG] 좋아요/댓글 수 해석 실패: {url}")
+        return None
+    return like_count, comment_count
+
+# Get an article page and its counts without a browser, None if the browser is needed
+async def get_static_article(fetcher: AsyncFetcher, url: str) -> tuple[BeautifulSoup, tuple[int, int]] | None:
+    try:
+        soup, counts = await asyncio.gather(parse_html_from_link(fetcher, url, "article"), fetch_counts(fetcher, url))
+    except Exception as e:
+        print(f"[DEBUG] 기사 정적 조회 실패: {url} {e}")
+        return None
+    if counts is None or any(selector.select_one(soup) is None for selector in ARTICLE_REQUIRED):
+        return None
+    return soup, counts
+
+# Get article pages with their counts, falling back to the browser pool
+async def get_articles(fetcher: AsyncFetcher, urls: List[str]) -> List[tuple[BeautifulSoup, tuple[int, int] | None] | None]:
     """
-    Parses the HTML content and returns a BeautifulSoup object.
+    Counts are None for pages rendered in the browser, parse_article then
+    reads them from the page. Pages that failed both ways are None.
     """
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'
-    }
+    pages: list = [None] * len(urls)
+    if SCRAPER_STATIC:
+        pages = list(await asyncio.gather(*(get_static_article(fetcher, url) for url in urls)))
+
+    fallback = [index for index, page in enumerate(pages) if page is None]
+    if fallback:
+        print(f"[DEBUG] 브라우저로 조회할 기사: {len(fallback)}/{len(urls)}")
+        soups = await asyncio.to_thread(get_dynamic_article_htmls, [urls[index] for index in fallback])
+        for index, soup in zip(fallback, soups):
+            pages[index] = (soup, None) if soup is not None else None
+    return pages
+
+# Get press pages, None for the ones that failed
+async def get_press_pages(fetcher: AsyncFetcher, urls: List[str]) -> List[BeautifulSoup | None]:
+    async def get(url: str) -> BeautifulSoup | None:
+        try:
+            return await parse_html_from_link(fetcher, url, "press")
+        except Exception as e:
+            print(f"[DEBUG] 언론사 페이지 조회 실패: {url} {e}")
+            return None
+
+    return list(await asyncio.gather(*(get(url) for url in urls)))
+
+# Extract a press (id, name, logo) from its page
+def parse_press(press_soup: _bs4.BeautifulSoup, press_link: str) -> tuple | None:
+    press_img_tag = press_soup.find('a', class_='press_hd_ci_image')
+    # print(press_img_tag)
+    if not press_img_tag or not isinstance(press_img_tag, _bs4.element.Tag):
+        print(None)
+        return None
+    img_tag = press_img_tag.find('img')
+    logo_img_src = None
+    if img_tag and isinstance(img_tag, _bs4.element.Tag):
+        if img_tag.has_attr('src'):
+            logo_img_src = img_tag['src']
+
+    press_name_tag = press_soup.find('h3', class_='press_hd_name')
+    if not press_name_tag or not isinstance(press_name_tag, _bs4.element.Tag):
+        print(None)
+        return None
+    press_name = press_name_tag.get_text(strip=True)
+    print(press_name)
+
+    # print(logo_img_src)
+    press_id = press_link[30:33]
+
+    return (press_id, press_name, logo_img_src)
+
+# Extract one article from its rendered page
+def parse_article(article_soup: _bs4.BeautifulSoup, ranking: str, title: str, url, counts: tuple[int, int] | None = None) -> dict | None:
+    press_id = str(url)[33:36]
+
+    content_tag = article_soup.find('article', id="dic_area")
+
+    if not content_tag or not isinstance(content_tag, _bs4.element.Tag):
+        print("-------------")
+        print("No content found for article.")
+        print(url)
+        print("-------------")
+        return None
+
+
+    for tag in ARTICLE_IMAGE_NODES.select(content_tag):
+        tag.decompose()  # remove the tag and its contents
+    
+    content = content_tag.get_text(separator="\n", strip=True)
 
-    response = _requests.get(url, headers=headers)
-    response.raise_for_status()  # Raise an error for bad responses
-    html = response.text
-    soup = _bs4.BeautifulSoup(html, 'html.parser')
-    return soup
+    published_at_tag = ARTICLE_DATE.select_one(article_soup)
 
-# Extract data
-def extract_data(soup: _bs4.BeautifulSoup) -> tuple[list, list]:
-    # Find all press companies
-    press_companies = soup.find_all('a', class_="rankingnews_box_head nclicks('RBP.rnkpname')")
+    if published_at_tag and published_at_tag.has_attr("data-date-time"):
+        published_at = published_at_tag["data-date-time"]
+    else:
+        print("No published date found for article.")
+        print(url)
+        return None
 
-    press_logo_dict = set()
-    press_logo_dict.add(("000", "unknown", "https://static.vecteezy.com/system/resources/previews/022/059/000/non_2x/no-image-available-icon-vector.jpg"))
-    count = 1
+    edited_at_tag = ARTICLE_MODIFY_DATE.select_one(article_soup)
+    edited_at = edited_at_tag.get("data-modify-date-time") if edited_at_tag else None
+    
+    # image_tag = article_soup.find('img', id='img1')
+
+    # print(url)
+    # print(image_tag)
+    # # print(article_soup)
+    # if image_tag and isinstance(image_tag, _bs4.element.Tag):
+    #     image_text = image_tag.get("alt")
+    #     image_src = image_tag.get("src")
+    #     print(image_text)
+    #     print(image_src)
+    # else:
+    #     image_text = None
+    #     image_src = None
+    
+    if counts is not None:
+        like_count, comment_count = counts
+    else:
+        comment_count_tag = COMMENT_COUNT.select_one(article_soup)
+        comment_count = comment_count_tag.get_text(strip=True) if comment_count_tag else 0
+        if comment_count:
+            comment_count = int(comment_count.replace('"', "").replace(",", ""))
 
-    for press in press_companies:
-        print("Work in progress... (Press)", count)
-        count += 1
-        if isinstance(press, _bs4.element.Tag):
-            press_link = str(press['href'])
-            press_soup = parse_html_from_link(press_link)
+        like_count_tag = LIKE_COUNT.select_one(article_soup)
+        like_count = like_count_tag.get_text(strip=True) if like_count_tag else 0
+        if like_count:
+            like_count = int(like_count.replace(",", ""))
+
+    genre_tag_results = article_soup.find_all('a', class_="Nitem_link")
+    genre = None
+
+    for genre_tag in genre_tag_results:
+        if genre_tag and isinstance(genre_tag, _bs4.element.Tag):
+            if genre_tag['aria-selected'] == "true":
+                genre = genre_tag.get_text(strip=True)
+                break
             
-            press_img_tag = press_soup.find('a', class_='press_hd_ci_image')
-            # print(press_img_tag)
-            if not press_img_tag or not isinstance(press_img_tag, _bs4.element.Tag):
-                print(None)
-                continue
-            img_tag = press_img_tag.find('img')
-            logo_img_src = None
-            if img_tag and isinstance(img_tag, _bs4.element.Tag):
-                if img_tag.has_attr('src'):
-                    logo_img_src = img_tag['src']
-
-            press_name_tag = press_soup.find('h3', class_='press_hd_name')
-            if not press_name_tag or not isinstance(press_name_tag, _bs4.element.Tag):
-                print(None)
-                continue
-            press_name = press_name_tag.get_text(strip=True)
-            print(press_name)
+    author_tag = article_soup.find('em', class_='media_journalistcard_summary_name_text')
+    if not author_tag:
+        print("-------------")
+        print("No author found for article.")
+        print(url)
+        print("-------------")
+        return None
+
+    
+    author_name = str(author_tag.get_text(strip=True)).split(" 기자")[0]
+    a_tag = author_tag.find_parent('a')
+    if a_tag and isinstance(a_tag, _bs4.element.Tag):
+        author_url = a_tag.get("href")
+        author_id = str(author_url)[39:]
+        press_id = str(author_url)[35:38]
+    else:
+        print("-------------")
+        print("No author URL found for article.")
+        print(a_tag)
+        print(url)
+        print("-------------")
+        return None
+
+    if isinstance(like_count, int) and isinstance(comment_count, int):
+        activity_score = like_count + comment_count * 2
+        print(f"Activity Score: {activity_score}")
+    else:
+        print("Error: Like or comment count is not an integer.")
+        activity_score = 0
+
+    return {
+        "ranking": ranking,
+        "title": title,
+        "url": url,
+        "content": content,
+        "published_at": published_at,
+        "edited_at": edited_at,
+        # "image_text": image_text,
+        # "image_src": image_src,
+        "genre": genre,
+        "activity_score": activity_score,
+        "author_name": author_name,
+        "author_id": author_id,
+        "press_id": press_id
+    }
 
-            # print(logo_img_src)
-            press_id = press_link[30:33]
- 
-            press_logo_dict.add((press_id, press_name, logo_img_src))
+# Extract press links and (count, ranking, title, url) of the articles to crawl from the ranking page
+def parse_ranking(soup: _bs4.BeautifulSoup) -> tuple[list, list]:
+    # Find all press companies
+    press_companies = soup.find_all('a', class_="rankingnews_box_head nclicks('RBP.rnkpname')")
+    press_links = [str(press['href']) for press in press_companies if isinstance(press, _bs4.element.Tag)]
 
-    list_items = soup.select("ul.rankingnews_list > li")
+    list_items = RANKING_ITEMS.select(soup)
 
-    news_items = []
+    listings = []
     count = 0
     for item in list_items:
         count += 1
         if (count % 5) > 3 or (count % 5) == 0:
             continue
-        print("Work in progress... (Article)", count)
         # Ranking number
-        ranking_tag = item.select_one("em.list_ranking_num")
+        ranking_tag = RANKING_NUMBER.select_one(item)
         ranking = ranking_tag.get_text(strip=True) if ranking_tag else "?"
 
         # Title and URL
-        title_tag = item.select_one("div.list_content > a.list_title")
+        title_tag = RANKING_TITLE.select_one(item)
         if title_tag:
             title = title_tag.get_text(strip=True)
             url = title_tag.get("href")
@@ -124,116 +275,55 @@ def extract_data(soup: _bs4.BeautifulSoup) -> tuple[list, list]:
             print("-------------")
             continue
 
-        press_id = str(url)[33:36]
+        listings.append((count, ranking, title, url))
 
-        article_soup = get_dynamic_article_html(str(url))
-        content_tag = article_soup.find('article', id="dic_area")
+    return press_links, listings
 
-        if not content_tag or not isinstance(content_tag, _bs4.element.Tag):
-            print("-------------")
-            print("No content found for article.")
-            print(url)
-            print("-------------")
-            continue
+# Extract data
+async def extract_data(soup: _bs4.BeautifulSoup, fetcher: AsyncFetcher) -> tuple[list, list]:
+    press_links, listings = parse_ranking(soup)
 
+    press_logo_dict = set()
+    press_logo_dict.add(("000", "unknown", "https://static.vecteezy.com/system/resources/previews/022/059/000/non_2x/no-image-available-icon-vector.jpg"))
 
-        for tag in content_tag.select("em.img_desc, span.end_photo_org"):
-            tag.decompose()  # remove the tag and its contents
-        
-        content = content_tag.get_text(separator="\n", strip=True)
+    # Press names and logos memoized by earlier crawls skip their page
+    cache = fetcher.cache
+    memoized = {link: cache.get_press(link[30:33]) if cache is not None else None for link in press_links}
+    fetch_links = [link for link in press_links if memoized[link] is None]
 
-        published_at_tag = article_soup.select_one("span._ARTICLE_DATE_TIME")
+    # Fetch every press page and article at once
+    press_soups, article_pages = await asyncio.gather(
+        get_press_pages(fetcher, fetch_links),
+        get_articles(fetcher, [str(url) for _, _, _, url in listings]),
+    )
+    fetched = dict(zip(fetch_links, press_soups))
 
-        if published_at_tag and published_at_tag.has_attr("data-date-time"):
-            published_at = published_at_tag["data-date-time"]
+    for count, press_link in enumerate(press_links, start=1):
+        print("Work in progress... (Press)", count)
+        press = memoized[press_link]
+        if press is not None:
+            print(press[1])
         else:
-            print("No published date found for article.")
-            print(url)
-            continue
-
-        edited_at_tag = article_soup.select_one("span._ARTICLE_MODIFY_DATE_TIME")
-        edited_at = edited_at_tag.get("data-modify-date-time") if edited_at_tag else None
-        
-        # image_tag = article_soup.find('img', id='img1')
-
-        # print(url)
-        # print(image_tag)
-        # # print(article_soup)
-        # if image_tag and isinstance(image_tag, _bs4.element.Tag):
-        #     image_text = image_tag.get("alt")
-        #     image_src = image_tag.get("src")
-        #     print(image_text)
-        #     print(image_src)
-        # else:
-        #     image_text = None
-        #     image_src = None
-        
-        comment_count_tag = article_soup.select_one("span.u_cbox_count")
-        comment_count = comment_count_tag.get_text(strip=True) if comment_count_tag else 0
-        if comment_count:
-            comment_count = int(comment_count.replace('"', "").replace(",", ""))
-
-        like_count_tag = article_soup.select_one("span._count_num")
-        like_count = like_count_tag.get_text(strip=True) if like_count_tag else 0
-        if like_count:
-            like_count = int(like_count.replace(",", ""))
-
-        genre_tag_results = article_soup.find_all('a', class_="Nitem_link")
-        genre = None
-
-        for genre_tag in genre_tag_results:
-            if genre_tag and isinstance(genre_tag, _bs4.element.Tag):
-                if genre_tag['aria-selected'] == "true":
-                    genre = genre_tag.get_text(strip=True)
-                    break
-                
-        author_tag = article_soup.find('em', class_='media_journalistcard_summary_name_text')
-        if not author_tag:
-            print("-------------")
-            print("No author found for article.")
-            print(url)
-            print("-------------")
-            continue
+            press_soup = fetched[press_link]
+            if press_soup is None:
+                continue
+            press = parse_press(press_soup, press_link)
+            if not press:
+                continue
+            if cache is not None:
+                cache.set_press(*press)
+        press_logo_dict.add(press)
 
-        
-        author_name = str(author_tag.get_text(strip=True)).split(" 기자")[0]
-        a_tag = author_tag.find_parent('a')
-        if a_tag and isinstance(a_tag, _bs4.element.Tag):
-            author_url = a_tag.get("href")
-            author_id = str(author_url)[39:]
-            press_id = str(author_url)[35:38]
-        else:
-            print("-------------")
-            print("No author URL found for article.")
-            print(a_tag)
-            print(url)
-            print("-------------")
+    news_items = []
+    for (count, ranking, title, url), article_page in zip(listings, article_pages):
+        print("Work in progress... (Article)", count)
+        if article_page is None:
             continue
+        article_soup, counts = article_page
+        news_item = parse_article(article_soup, ranking, title, url, counts)
+        if news_item:
+            news_items.append(news_item)
 
-        if isinstance(like_count, int) and isinstance(comment_count, int):
-            activity_score = like_count + comment_count * 2
-            print(f"Activity Score: {activity_score}")
-        else:
-            print("Error: Like or comment count is not an integer.")
-            activity_score = 0
-
-        news_items.append({
-            "ranking": ranking,
-            "title": title,
-            "url": url,
-            "content": content,
-            "published_at": published_at,
-            "edited_at": edited_at,
-            # "image_text": image_text,
-            # "image_src": image_src,
-            "genre": genre,
-            "activity_score": activity_score,
-            "author_name": author_name,
-            "author_id": author_id,
-            "press_id": press_id
-        })
-
-    
     # print(json.dumps(press_list, sort_keys=True, indent=4, ensure_ascii=False))
     # print(f"Total press companies: {len(press_list)}")
 
@@ -246,10 +336,28 @@ def extract_data(soup: _bs4.BeautifulSoup) -> tuple[list, list]:
     return news_list, list(press_logo_dict)
 
 # Crawl for articles
-def crawl():
-    soup = parse_html_from_link('https://news.naver.com/main/ranking/popularDay.naver')
-    data = extract_data(soup)
-    return data
+async def crawl_async(url: str = RANKING_URL, fetcher: AsyncFetcher | None = None):
+    if fetcher is None:
+        async with AsyncFetcher() as fetcher:
+            return await crawl_async(url, fetcher)
+
+    try:
+        # The ranking changes all the time, always revalidate it
+        soup = await parse_html_from_link(fetcher, url, "ranking", ttl=0)
+        data = await extract_data(soup, fetcher)
+        return data
+    finally:
+        # Browsers are only needed again at the next crawl
+        await asyncio.to_thread(close_browser_pool)
+
+def crawl(url: str = RANKING_URL):
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(crawl_async(url))
+    # Called inside a running loop (e.g. the app imported by uvicorn), crawl on another thread
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, crawl_async(url)).result()
 
 # Testing
 # ls = crawl()
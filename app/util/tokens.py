@@ -0,0 +1,119 @@
+import re
+from typing import List
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Tokenizer of gpt-4o / gpt-4o-mini
+ENCODING_NAME = "o200k_base"
+
+# Per-message framing tokens of the chat format
+MESSAGE_OVERHEAD = 4
+
+_encoding = None
+_encoding_failed = False
+
+# Whitespace after sentence-ending punctuation, or line breaks
+SENTENCE_END = re.compile(r"(?<=[.!?。])\s+|\n+")
+
+
+def _get_encoding():
+    global _encoding, _encoding_failed
+    if _encoding is None and tiktoken is not None and not _encoding_failed:
+        try:
+            _encoding = tiktoken.get_encoding(ENCODING_NAME)
+        except Exception as e:
+            # The encoding file is downloaded on first use
+            print(f"[DEBUG] tiktoken 사용 불가, 근사치로 계산: {e}")
+            _encoding_failed = True
+    return _encoding
+
+
+# Count the tokens of a text
+def count_tokens(text: str | None) -> int:
+    """
+    Exact with tiktoken installed. Otherwise an estimate that errs high:
+    one token per non-ASCII character (Hangul is close to that) and one per
+    four ASCII characters.
+    """
+    if not text:
+        return 0
+
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+
+    ascii_chars = sum(1 for char in text if char < "\x80")
+    return len(text) - ascii_chars + (ascii_chars + 3) // 4
+
+
+# Count the prompt tokens of chat messages
+def count_message_tokens(messages: list) -> int:
+    return sum(count_tokens(message.get("content")) + MESSAGE_OVERHEAD for message in messages)
+
+
+# Split a text into sentences, keeping separators so "".join(...) == text
+def split_sentences(text: str) -> List[str]:
+    sentences = []
+    start = 0
+    for match in SENTENCE_END.finditer(text):
+        sentences.append(text[start:match.end()])
+        start = match.end()
+    if start < len(text):
+        sentences.append(text[start:])
+    return sentences
+
+
+# Split a text into chunks of at most max_tokens at sentence boundaries
+def chunk_text(text: str, max_tokens: int) -> List[str]:
+    """
+    Chunks are near-equal in size so their generations finish together.
+    A single sentence longer than max_tokens becomes its own chunk.
+    """
+    total = count_tokens(text)
+    if total <= max_tokens:
+        return [text]
+
+    # Aim for equal chunks rather than full ones and a short remainder
+    chunk_count = -(-total // max_tokens)
+    target = -(-total // chunk_count)
+
+    chunks = []
+    current = ""
+    current_tokens = 0
+    for sentence in split_sentences(text):
+        tokens = count_tokens(sentence)
+        # Cut at the sentence boundary nearest the target size
+        if current and (current_tokens + tokens > max_tokens or current_tokens + tokens / 2 > target):
+            chunks.append(current)
+            current, current_tokens = "", 0
+        current += sentence
+        current_tokens += tokens
+    if current.strip():
+        # Fold a short tail (bylines, copyright) into the previous chunk
+        if chunks and count_tokens(chunks[-1]) + current_tokens <= max_tokens:
+            chunks[-1] += current
+        else:
+            chunks.append(current)
+    elif chunks:
+        chunks[-1] += current
+    return chunks
+
+
+# Cut a text to at most max_tokens at a sentence boundary
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    if count_tokens(text) <= max_tokens:
+        return text
+
+    kept = ""
+    kept_tokens = 0
+    for sentence in split_sentences(text):
+        tokens = count_tokens(sentence)
+        if kept_tokens + tokens > max_tokens:
+            break
+        kept += sentence
+        kept_tokens += tokens
+    # One sentence over the budget, cut it by characters
+    return kept or text[:max_tokens]
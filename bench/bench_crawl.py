@@ -0,0 +1,86 @@
+"""
+Time a full crawl of the synthetic corpus and check its output against
+article_data.json. Timings reflect the scraper against generated pages,
+not against the real site.
+
+Starts bench/serve.py in-process with per-response latency (and optional
+503s), points the scraper at it and crawls once per browser pool size and
+cache state: cold (empty HTTP cache), revalidate (every page revalidated
+with a conditional GET) and warm (pages within their TTL, press names and
+logos memoized). Articles are fetched over plain HTTP unless
+--browser-only is given, the pool then only serves fallbacks.
+
+    python -m bench.bench_crawl --latency 0.1 --error-rate 0.05
+    python -m bench.bench_crawl --browser-only --pool-sizes 1,4,8 --latency 0.1
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from bench.serve import start_server
+
+# (run, cache TTL) in order, sharing one cache
+CACHE_RUNS = [("cold", None), ("revalidate", 0.0), ("warm", None)]
+
+
+def _by_url(articles: list) -> list:
+    return sorted(articles, key=lambda article: article["url"])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the scraper against bench/fixtures")
+    parser.add_argument("--pool-sizes", default="1,4", help="comma separated browser pool sizes")
+    parser.add_argument("--latency", type=float, default=0.1, help="seconds added to every response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of responses failing with 503")
+    parser.add_argument("--browser-only", action="store_true", help="render every article in the browser pool")
+    parser.add_argument("--expected", default="article_data.json")
+    parser.add_argument("--expected-press", default="press_logo_set.json")
+    args = parser.parse_args()
+
+    server, base_url = start_server(args.latency, args.error_rate)
+    # Read by the scraper at import
+    os.environ["SCRAPER_MIRROR"] = base_url
+    os.environ["SCRAPER_STATIC"] = "false" if args.browser_only else "true"
+
+    from app.util import browser, scraper
+    from app.util.crawler import AsyncFetcher
+    from app.util.http_cache import SCRAPER_CACHE_TTL, HTTPCache
+
+    with open(args.expected, encoding="utf-8") as f:
+        expected = _by_url(json.load(f))
+    with open(args.expected_press, encoding="utf-8") as f:
+        expected_press = sorted(tuple(press) for press in json.load(f))
+
+    async def crawl(fetcher: AsyncFetcher):
+        async with fetcher:
+            return await scraper.crawl_async(fetcher=fetcher)
+
+    for size in [int(size) for size in args.pool_sizes.split(",")]:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = HTTPCache(os.path.join(cache_dir, "scraper_cache.sqlite3"))
+            for run, ttl in CACHE_RUNS:
+                # Created at this size, crawl_async closes it when done
+                browser.get_browser_pool(size)
+                server.requests = server.peak_in_flight = server.not_modified = 0
+                fetcher = AsyncFetcher(cache=cache, cache_ttl=SCRAPER_CACHE_TTL if ttl is None else ttl)
+                started = time.perf_counter()
+                news_list, presses = asyncio.run(crawl(fetcher))
+                elapsed = time.perf_counter() - started
+
+                matches = _by_url(news_list) == expected and sorted(presses) == expected_press
+                print(
+                    f"pool={size} {run:<10} articles={len(news_list)} presses={len(presses)} "
+                    f"{elapsed:.2f}s ({len(news_list) / elapsed:.1f} articles/s) "
+                    f"requests={server.requests} not_modified={server.not_modified} "
+                    f"cache_hits={fetcher.stats['cache_hits']} peak_in_flight={server.peak_in_flight} "
+                    f"{'output matches' if matches else 'OUTPUT DIFFERS'}"
+                )
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark the scraper's HTML parsing over the synthetic pages in
+bench/fixtures, per parser strategy: tree builder (html.parser, lxml if
+installed) times full tree or strained to the nodes read.
+
+The pages are generated from the scraper's own selectors, so the rates and
+memory reported do not reflect real Naver pages, whose markup and size
+differ.
+
+Each page is parsed and extracted exactly as in a crawl (parse_ranking,
+parse_press, parse_article). Reports pages/sec per page kind and the peak
+traced memory of a single page, and checks every strategy extracts the
+same data as the first.
+
+    python -m bench.bench_parse --repeat 3
+"""
+import argparse
+import contextlib
+import glob
+import io
+import os
+import time
+import tracemalloc
+
+from bench.make_fixtures import FIXTURE_DIR
+from app.util import parsing, scraper
+
+
+def _pages() -> dict:
+    """{kind: [(url, html)]} of the synthetic pages."""
+    def load(pattern: str) -> list:
+        pages = []
+        for path in sorted(glob.glob(os.path.join(FIXTURE_DIR, pattern), recursive=True)):
+            if "@" in os.path.basename(path):
+                continue
+            url = "https://" + os.path.relpath(path, FIXTURE_DIR)[:-len(".html")].replace(os.sep, "/")
+            with open(path, encoding="utf-8") as f:
+                pages.append((url, f.read()))
+        return pages
+
+    return {
+        "ranking": load("news.naver.com/main/ranking/*.html"),
+        "press": load("media.naver.com/press/*/ranking.html"),
+        "article": load("n.news.naver.com/article/**/*.html"),
+    }
+
+
+def extract(kind: str, url: str, html: str, parser: str, strain: bool):
+    soup = parsing.parse_page(html, kind, parser=parser, strain=strain)
+    if kind == "ranking":
+        return scraper.parse_ranking(soup)
+    if kind == "press":
+        return scraper.parse_press(soup, url)
+    return scraper.parse_article(soup, "1", "title", url)
+
+
+def strategies() -> list:
+    parsers = ["html.parser"] + (["lxml"] if parsing.lxml is not None else [])
+    return [(parser, strain) for parser in parsers for strain in (False, True)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark scraper parsing strategies on bench/fixtures")
+    parser.add_argument("--repeat", type=int, default=3, help="timed passes over the corpus")
+    args = parser.parse_args()
+
+    pages = _pages()
+    print(" ".join(f"{kind}={len(kind_pages)}" for kind, kind_pages in pages.items()), "pages")
+
+    baseline = None
+    for builder, strain in strategies():
+        name = f"{builder}{' strained' if strain else ''}"
+        # Silence the scraper's progress prints
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = {
+                kind: [extract(kind, url, html, builder, strain) for url, html in kind_pages]
+                for kind, kind_pages in pages.items()
+            }
+
+            rates = {}
+            for kind, kind_pages in pages.items():
+                started = time.perf_counter()
+                for _ in range(args.repeat):
+                    for url, html in kind_pages:
+                        extract(kind, url, html, builder, strain)
+                rates[kind] = len(kind_pages) * args.repeat / (time.perf_counter() - started)
+
+            peaks = {}
+            tracemalloc.start()
+            for kind, kind_pages in pages.items():
+                peak = 0
+                for url, html in kind_pages:
+                    tracemalloc.reset_peak()
+                    extract(kind, url, html, builder, strain)
+                    peak = max(peak, tracemalloc.get_traced_memory()[1])
+                peaks[kind] = peak
+            tracemalloc.stop()
+
+        if baseline is None:
+            baseline = results
+        same = results == baseline
+        print(
+            f"{name:<22} "
+            + " ".join(f"{kind} {rates[kind]:7.1f}/s {peaks[kind] / 1024:6.0f}KiB" for kind in pages)
+            + f"  {'same output' if same else 'OUTPUT DIFFERS'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+Build the synthetic page corpus in bench/fixtures from article_data.json
+and press_logo_set.json.
+
+No page is saved from the live site. Pages are generated with the markup
+the scraper's own selectors read on news.naver.com, media.naver.com and
+n.news.naver.com, wrapped in made-up navigation/footer boilerplate, so
+they only approximate the size and shape of real pages and prove nothing
+about the real markup. Crawling the corpus reproduces article_data.json.
+Like/comment counts are filled in by script after load, as assumed of the
+live site, and are also written as responses of the count endpoints in
+app/util/counts.py, in the formats its parsers assume.
+
+    python -m bench.make_fixtures
+"""
+import argparse
+import hashlib
+import html
+import json
+import os
+import random
+from itertools import groupby
+from urllib.parse import unquote
+
+from app.util.counts import article_ids, comment_count_url, like_count_url
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+RANKING_URL = "https://news.naver.com/main/ranking/popularDay.naver"
+GENRES = ["정치", "경제", "사회", "생활", "세계", "IT"]
+
+
+def fixture_path(url: str, with_query: bool = False) -> str:
+    """
+    Fixture file of a URL: fixtures/<host>/<path>.html, query dropped.
+    Endpoints answering per query get a hash of the query appended.
+    """
+    host_path, _, query = url.split("://", 1)[1].partition("?")
+    if with_query and query:
+        host_path += "@" + hashlib.sha1(unquote(query).encode("utf-8")).hexdigest()[:12]
+    return os.path.join(FIXTURE_DIR, host_path + ".html")
+
+
+def _write(url: str, body: str, with_query: bool = False) -> None:
+    path = fixture_path(url, with_query)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(body)
+
+
+def _boilerplate(rng: random.Random, links: int) -> tuple[str, str]:
+    nav = "".join(
+        f'<li class="Nlist_item"><a href="https://news.naver.com/section/{100 + i}" class="Nitem_link_menu" data-clk="nav{i}">메뉴 {i}</a></li>'
+        for i in range(links)
+    )
+    related = "".join(
+        f'<li class="ofra_list_item"><a href="https://n.news.naver.com/article/{rng.randrange(1, 999):03d}/{rng.randrange(10 ** 9):010d}" '
+        f'class="ofra_list_link"><div class="ofra_list_thumb"><img src="https://imgnews.pstatic.net/image/{i}.jpg" alt=""></div>'
+        f'<span class="ofra_list_tit">관련 기사 제목 {i} {"가나다라마바사" * 3}</span></a></li>'
+        for i in range(links // 2)
+    )
+    script = "<script>window.__STATE__ = " + json.dumps({"menu": list(range(links))}) + ";</script>"
+    header = f'<header id="header"><div class="Ngnb"><ul class="Nlist">{nav}</ul></div></header>{script}'
+    footer = f'<aside class="ofra"><ul class="ofra_list">{related}</ul></aside><footer id="footer"><p>Copyright NAVER Corp. All Rights Reserved.</p></footer>'
+    return header, footer
+
+
+def _page(title: str, header: str, body: str, footer: str) -> str:
+    return (
+        f'<!DOCTYPE html><html lang="ko"><head><meta charset="utf-8"><title>{html.escape(title)}</title>'
+        f'<link rel="stylesheet" href="https://ssl.pstatic.net/static.news/pc/news.css"></head>'
+        f'<body>{header}<div id="ct_wrap"><div id="ct">{body}</div></div>{footer}</body></html>'
+    )
+
+
+def _counts(article: dict) -> tuple[int, int]:
+    """Split activity_score back into (like, comment) counts."""
+    score = article["activity_score"] or 0
+    comment = score // 3
+    return score - comment * 2, comment
+
+
+def article_page(article: dict, rng: random.Random) -> str:
+    press_id = article["url"][33:36]
+    like, comment = _counts(article)
+
+    tabs = "".join(
+        f'<li class="Nlist_item"><a href="https://news.naver.com/section/{100 + i}" class="Nitem_link" '
+        f'aria-selected="{"true" if genre == article["genre"] else "false"}"><span class="Nitem_link_menu">{genre}</span></a></li>'
+        for i, genre in enumerate(GENRES)
+    )
+    content = "<br>\n".join(html.escape(line) for line in article["content"].split("\n")) if article["content"] else ""
+    photo = (
+        '<span class="end_photo_org"><img src="https://imgnews.pstatic.net/image/photo.jpg" alt="">'
+        '<em class="img_desc">사진 설명은 본문에서 제외된다</em></span><br>\n'
+    ) if article["content"] else ""
+    modified = (
+        f'<span class="media_end_head_info_datestamp_time _ARTICLE_MODIFY_DATE_TIME" '
+        f'data-modify-date-time="{article["edited_at"]}">{article["edited_at"]}</span>'
+    ) if article["edited_at"] else ""
+
+    body = f'''
+<div class="Nlnb"><ul class="Nlist">{tabs}</ul></div>
+<div class="media_end_head">
+<h2 id="title_area" class="media_end_head_headline"><span>{html.escape(article["title"])}</span></h2>
+<div class="media_end_head_info_datestamp">
+<span class="media_end_head_info_datestamp_time _ARTICLE_DATE_TIME" data-date-time="{article["published_at"]}">{article["published_at"]}</span>
+{modified}
+</div>
+<div class="media_end_head_tool">
+<a class="u_likeit_list_btn"><span class="u_likeit_text _count_num" data-count="{like}"></span></a>
+<a class="media_end_head_cmtcount_button"><span class="u_cbox_count" data-count="{comment}"></span></a>
+</div>
+</div>
+<div id="newsct_article" class="newsct_article _article_body">
+<article id="dic_area" class="go_trans _article_content">
+{photo}{content}
+</article>
+</div>
+<div class="media_journalistcard">
+<a href="https://media.naver.com/journalist/{press_id}/{article["author_id"]}" class="media_journalistcard_summary_link">
+<em class="media_journalistcard_summary_name_text">{html.escape(article["author_name"])} 기자</em>
+</a>
+</div>
+<script>
+// Counts arrive after load, as on the live page
+setTimeout(function () {{
+  document.querySelectorAll("._count_num, .u_cbox_count").forEach(function (el) {{
+    el.textContent = Number(el.dataset.count).toLocaleString("en-US");
+  }});
+}}, 300);
+</script>
+'''
+    header, footer = _boilerplate(rng, 40)
+    return _page(article["title"], header, body, footer)
+
+
+def count_responses(article: dict) -> tuple[str, str]:
+    """Bodies of the like and comment count endpoints of an article."""
+    oid, aid = article_ids(article["url"])
+    like, comment = _counts(article)
+    likes = {"contents": [{
+        "serviceId": "NEWS",
+        "contentsId": f"ne_{oid}_{aid}",
+        "reactions": [{"reactionType": "like", "count": like, "isReacted": False}] if like else [],
+    }]}
+    comments = {"success": True, "code": "1000", "result": {"count": {"comment": comment, "reply": 0, "total": comment}}}
+    return json.dumps(likes), f"_cbox({json.dumps(comments)});"
+
+
+def press_page(press_id: str, name: str, logo: str, rng: random.Random) -> str:
+    body = f'''
+<div class="press_hd">
+<a href="https://media.naver.com/press/{press_id}" class="press_hd_ci_image"><img src="{html.escape(logo or "")}" alt="{html.escape(name)}"></a>
+<div class="press_hd_main"><h3 class="press_hd_name">{html.escape(name)}</h3></div>
+</div>
+'''
+    header, footer = _boilerplate(rng, 30)
+    return _page(name, header, body, footer)
+
+
+def ranking_page(boxes: list, rng: random.Random) -> str:
+    """
+    boxes: (press_id, name, articles) in page order. The scraper reads the
+    first three of every five items, so articles fill those slots.
+    """
+    parts = []
+    for press_id, name, articles in boxes:
+        items = []
+        for slot in range(5):
+            article = articles[slot] if slot < min(3, len(articles)) else None
+            if article is None:
+                # Slots the scraper skips
+                items.append(f'<li><em class="list_ranking_num">{slot + 1}</em><div class="list_content"><span class="list_time">1시간전</span></div></li>')
+                continue
+            items.append(
+                f'<li><em class="list_ranking_num">{article["ranking"]}</em><div class="list_content">'
+                f'<a href="{html.escape(article["url"])}" class="list_title nclicks(\'RBP.rnknws\')">{html.escape(article["title"])}</a>'
+                f'<span class="list_time">1시간전</span></div></li>'
+            )
+        parts.append(
+            f'<div class="rankingnews_box">'
+            f'<a href="https://media.naver.com/press/{press_id}/ranking?type=popular" class="rankingnews_box_head nclicks(\'RBP.rnkpname\')">'
+            f'<span class="rankingnews_thumb"><img src="https://mimgnews.pstatic.net/image/upload/office_logo/{press_id}.png" alt=""></span>'
+            f'<strong class="rankingnews_name">{html.escape(name)}</strong></a>'
+            f'<ul class="rankingnews_list">{"".join(items)}</ul></div>'
+        )
+    header, footer = _boilerplate(rng, 60)
+    return _page("랭킹", header, f'<div class="rankingnews _popularWelBase">{"".join(parts)}</div>', footer)
+
+
+def build(article_path: str, press_path: str, seed: int = 0) -> int:
+    rng = random.Random(seed)
+    with open(article_path, encoding="utf-8") as f:
+        articles = json.load(f)
+    with open(press_path, encoding="utf-8") as f:
+        presses = {press_id: (name, logo) for press_id, name, logo in json.load(f) if press_id != "000"}
+
+    boxes = []
+    for press_id, group in groupby(articles, key=lambda article: article["url"][33:36]):
+        group = list(group)
+        name = presses.get(press_id, (f"언론사{press_id}", None))[0]
+        boxes.append((press_id, name, group))
+        for article in group:
+            _write(article["url"], article_page(article, rng))
+            likes, comments = count_responses(article)
+            oid, aid = article_ids(article["url"])
+            _write(like_count_url(oid, aid), likes, with_query=True)
+            _write(comment_count_url(oid, aid), comments, with_query=True)
+
+    listed = {press_id for press_id, _, _ in boxes}
+    boxes += [(press_id, name, []) for press_id, (name, _) in presses.items() if press_id not in listed]
+
+    for press_id, (name, logo) in presses.items():
+        _write(f"https://media.naver.com/press/{press_id}/ranking", press_page(press_id, name, logo, rng))
+
+    _write(RANKING_URL, ranking_page(boxes, rng))
+    return len(articles) * 3 + len(presses) + 1
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the synthetic Naver page corpus")
+    parser.add_argument("--articles", default="article_data.json")
+    parser.add_argument("--press", default="press_logo_set.json")
+    args = parser.parse_args()
+    print(f"{build(args.articles, args.press)} files written to {FIXTURE_DIR}")
+
+
+if __name__ == "__main__":
+    main()
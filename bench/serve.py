@@ -0,0 +1,124 @@
+"""
+Serve the synthetic pages in bench/fixtures over HTTP.
+
+GET /<host>/<path>?<query> answers with the fixture generated for that
+query if any (count endpoints), else fixtures/<host>/<path>.html.
+--error-rate of responses fail with 503 to exercise retries. Responses
+carry an ETag and Last-Modified and conditional GETs get 304. Point the scraper at it with
+SCRAPER_MIRROR=http://127.0.0.1:8002.
+
+    python -m bench.serve --latency 0.05
+"""
+import argparse
+import hashlib
+import os
+import random
+import threading
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from bench.make_fixtures import FIXTURE_DIR, fixture_path
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        url = "http://" + self.path.lstrip("/")
+        candidates = [os.path.normpath(fixture_path(url, with_query)) for with_query in (True, False)]
+        file_path = next((path for path in candidates if path.startswith(FIXTURE_DIR) and os.path.isfile(path)), None)
+        if file_path is None:
+            self.send_error(404)
+            return
+
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            server.in_flight += 1
+            server.peak_in_flight = max(server.peak_in_flight, server.in_flight)
+            failed = server.rng.random() < server.error_rate
+        try:
+            time.sleep(server.latency)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+        if failed:
+            self.send_error(503)
+            return
+        with open(file_path, "rb") as f:
+            body = f.read()
+        modified = int(os.path.getmtime(file_path))
+        etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+
+        if self._not_modified(etag, modified):
+            with server.lock:
+                server.not_modified += 1
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", formatdate(modified, usegmt=True))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _not_modified(self, etag: str, modified: int) -> bool:
+        # If-None-Match wins over If-Modified-Since
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            return etag in [tag.strip() for tag in if_none_match.split(",")]
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since is not None:
+            try:
+                return modified <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def log_message(self, format, *args):
+        pass
+
+
+def create_server(host: str = "127.0.0.1", port: int = 8002, latency: float = 0.0, error_rate: float = 0.0, seed: int = 0) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), FixtureHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.error_rate = error_rate
+    server.rng = random.Random(seed)
+    server.lock = threading.Lock()
+    server.requests = 0
+    server.in_flight = 0
+    server.peak_in_flight = 0
+    server.not_modified = 0
+    return server
+
+
+# Serve in a background thread, returns the server and its base URL
+def start_server(latency: float = 0.0, error_rate: float = 0.0) -> tuple[ThreadingHTTPServer, str]:
+    server = create_server(port=0, latency=latency, error_rate=error_rate)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve the synthetic Naver page corpus")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8002)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of responses failing with 503")
+    args = parser.parse_args()
+
+    server = create_server(args.host, args.port, args.latency, args.error_rate)
+    print(f"Serving {FIXTURE_DIR} on http://{args.host}:{args.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import json
+import os
+import uuid
+from datetime import datetime
+
+from sqlalchemy.orm import Session
+
+from app.models import Article, Author, Press
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# Insert the pre-crawled articles the way the CRAWL ingestion does
+def seed_articles(session: Session) -> None:
+    with open(os.path.join(ROOT, "article_data.json"), encoding="utf-8") as f:
+        article_data = json.load(f)
+    with open(os.path.join(ROOT, "press_logo_set.json"), encoding="utf-8") as f:
+        press_logo_set = json.load(f)
+
+    press_ids = {a["press_id"] for a in article_data}
+    session.add_all(
+        Press(id=press_id, name=press_name, logo_img_src=press_logo)
+        for press_id, press_name, press_logo in press_logo_set if press_id in press_ids
+    )
+
+    authors = {(a["author_name"], a["author_id"], a["press_id"]) for a in article_data}
+    session.add_all(
+        Author(name=name, id=str(author_id) + str(press_id), author_key=int(author_id), press_id=press_id)
+        for name, author_id, press_id in authors
+    )
+
+    session.add_all(
+        Article(
+            id=uuid.uuid4(),
+            title=a["title"],
+            url=a["url"],
+            content=a["content"],
+            published_at=datetime.fromisoformat(a["published_at"]),
+            edited_at=datetime.fromisoformat(a["edited_at"]) if a["edited_at"] else None,
+            genre=a["genre"] or "",
+            activity_score=a["activity_score"],
+            ranking=int(a["ranking"]),
+            author_id=str(a["author_id"]) + str(a["press_id"]),
+            press_id=a["press_id"],
+        ) for a in article_data
+    )
+    session.commit()
+
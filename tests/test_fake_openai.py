@@ -0,0 +1,23 @@
+"""
+The fake OpenAI server's keyword answer is built from the titles of the
+keyword prompt, not from its instruction bullets.
+"""
+import json
+
+from app.util.AI import keyword_messages
+from app.util.fake_openai import fake_completion
+
+TITLES = [
+    "국회 예산안 처리 두고 여야 대치",
+    "예산안 협상 결렬, 국회 본회의 연기",
+    "반도체 수출 석 달 연속 증가",
+]
+
+
+def test_keywords_come_from_titles():
+    keywords = json.loads(fake_completion(keyword_messages(TITLES)))["keywords"]
+
+    assert keywords
+    for item in keywords:
+        assert any(item["keyword"] in title for title in TITLES), item["keyword"]
+    assert {item["keyword"] for item in keywords[:2]} == {"국회", "예산안"}
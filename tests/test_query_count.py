@@ -0,0 +1,91 @@
+"""
+Statements per feed request, counted with a before_cursor_execute listener
+on a seeded SQLite database: one cold, none once the response is cached.
+A genre without articles is a 404 on both its list and its feed.
+"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_db
+from app.core.cache import response_cache
+from app.main import app
+from app.models.base import Base
+from tests.seed import seed_articles
+
+FEED_URLS = [
+    "/article/page1",
+    "/article/genre/정치",
+    "/article/feed",
+    "/article/genre/정치/feed",
+]
+
+# No seeded 사설/칼럼 articles
+EMPTY_GENRE_URLS = [
+    "/article/genre/사설칼럼",
+    "/article/genre/사설칼럼/feed",
+]
+
+
+@pytest.fixture(scope="module")
+def engine(tmp_path_factory):
+    engine = create_engine(f"sqlite:///{tmp_path_factory.mktemp('db') / 'test.db'}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        seed_articles(session)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def client(engine):
+    def get_test_db():
+        with Session(engine, expire_on_commit=False) as session:
+            yield session
+
+    app.dependency_overrides[get_db] = get_test_db
+    response_cache.clear()
+    with TestClient(app) as client:
+        yield client
+    app.dependency_overrides.pop(get_db)
+    response_cache.clear()
+
+
+@pytest.fixture
+def statements(engine):
+    executed = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    yield executed
+    event.remove(engine, "before_cursor_execute", count)
+
+
+@pytest.mark.parametrize("url", FEED_URLS)
+def test_cold_feed_runs_one_statement(client, statements, url):
+    response = client.get(url)
+
+    assert response.status_code == 200
+    assert response.json()
+    assert len(statements) == 1, statements
+
+
+@pytest.mark.parametrize("url", FEED_URLS)
+def test_cached_feed_runs_no_statement(client, statements, url):
+    client.get(url)
+    statements.clear()
+
+    response = client.get(url)
+
+    assert response.status_code == 200
+    assert statements == []
+
+
+@pytest.mark.parametrize("url", EMPTY_GENRE_URLS)
+def test_empty_genre_is_not_found(client, url):
+    response = client.get(url)
+
+    assert response.status_code == 404
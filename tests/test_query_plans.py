@@ -0,0 +1,218 @@
+"""
+EXPLAIN the queries behind the feed, genre feed, view, highlight, bias and
+keyword routes on a migrated (alembic upgrade head) and seeded Postgres
+database and fail on any sequential scan, or on a ranked feed page or
+keyword window that does not walk its index.
+
+Runs against a scratch database next to DB_NAME (EXPLAIN_DB_NAME, default
+<DB_NAME>_explain) and is skipped when Postgres is not reachable. The seed
+is small enough for the planner to prefer sequential scans anyway, so plans
+are taken with enable_seqscan off: a Seq Scan left in the plan means no
+index serves the query.
+"""
+import json
+import os
+import subprocess
+import sys
+import uuid
+
+import psycopg2
+import pytest
+from fastapi.testclient import TestClient
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import Session
+
+import app.core.db as db
+from app.api.deps import get_db
+from app.core.cache import response_cache
+from app.core.search import title_index
+from app.main import app
+from app.models import Article, HighlightedArticle, NewsChat, StorySummary
+from tests.seed import ROOT, seed_articles
+
+EXPLAIN_DB_NAME = os.getenv("EXPLAIN_DB_NAME") or f"{db.DB_NAME}_explain"
+
+
+def _admin_connection():
+    try:
+        conn = psycopg2.connect(
+            dbname="postgres", user=db.DB_USER, password=db.DB_PASSWORD,
+            host=db.DB_HOST, port=db.DB_PORT, connect_timeout=3
+        )
+    except psycopg2.OperationalError as e:
+        pytest.skip(f"Postgres not reachable: {e}")
+    conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+    return conn
+
+
+@pytest.fixture(scope="module")
+def engine():
+    conn = _admin_connection()
+    with conn.cursor() as cursor:
+        cursor.execute(f"DROP DATABASE IF EXISTS {EXPLAIN_DB_NAME}")
+        cursor.execute(f"CREATE DATABASE {EXPLAIN_DB_NAME}")
+
+    engine = None
+    try:
+        # alembic/env.py builds its URL from the DB_* variables, without defaults
+        env = {
+            **os.environ, "DB_USER": db.DB_USER, "DB_PASSWORD": db.DB_PASSWORD,
+            "DB_HOST": db.DB_HOST, "DB_PORT": db.DB_PORT, "DB_NAME": EXPLAIN_DB_NAME
+        }
+        subprocess.run([sys.executable, "-m", "alembic", "upgrade", "head"], cwd=ROOT, env=env, check=True)
+        engine = create_engine(db.SQLALCHEMY_DATABASE_URI.rsplit("/", 1)[0] + f"/{EXPLAIN_DB_NAME}")
+        with Session(engine) as session:
+            seed_articles(session)
+            seed_assets(session)
+        with engine.connect() as connection:
+            connection.exec_driver_sql("ANALYZE")
+            connection.commit()
+        yield engine
+    finally:
+        if engine is not None:
+            engine.dispose()
+        with conn.cursor() as cursor:
+            cursor.execute(f"DROP DATABASE IF EXISTS {EXPLAIN_DB_NAME}")
+        conn.close()
+
+
+# Stored assets, so the view, highlight and bias routes only read
+def seed_assets(session: Session) -> None:
+    article = session.scalars(
+        select(Article).where(Article.genre == "정치").order_by(Article.activity_score.desc())
+    ).first()
+    session.add(NewsChat(id=uuid.uuid4(), article_id=article.id, speaker=1, speaker_name="기자", content="대사", order=1))
+    session.add(StorySummary(id=uuid.uuid4(), article_id=article.id, story="이야기", dictionary={}))
+    session.add(HighlightedArticle(article_id=article.id, spans=[[0, 1]]))
+    article.press.media_bias = "중도"
+    article.media_bias = "중도"
+    article.reporting_bias = "없음"
+    session.commit()
+
+
+@pytest.fixture(scope="module")
+def queries(engine) -> dict:
+    """
+    {query group: [(statement, parameters)]} of the SELECTs each group of
+    requests ran.
+    """
+    with Session(engine) as session:
+        article_id = session.scalars(select(HighlightedArticle.article_id)).first()
+        # Built once at startup from a full read, not part of any request
+        title_index.refresh(session)
+
+    def get_test_db():
+        with Session(engine, expire_on_commit=False) as session:
+            yield session
+
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    # No stored keyword buckets, so each bucket reads its title window
+    async def generate_keywords(titles, api_key) -> dict:
+        return {"keywords": [{"keyword": "정부", "score": 1}]}
+
+    def run(client: TestClient, url: str, method: str = "GET") -> dict:
+        response_cache.clear()
+        response = client.request(method, url)
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    def take() -> list:
+        statements, captured[:] = list(captured), []
+        return statements
+
+    groups = {}
+    event.listen(engine, "before_cursor_execute", capture)
+    app.dependency_overrides[get_db] = get_test_db
+    try:
+        with pytest.MonkeyPatch.context() as patch, TestClient(app) as client:
+            patch.setattr(db, "generate_keywords", generate_keywords)
+            # Keyword buckets open their own sessions on the module engine
+            patch.setattr(db, "engine", engine)
+
+            # First pages, then the keyset continuation WHERE (activity_score, id) < cursor
+            run(client, "/article/page1")
+            feed = run(client, "/article/feed")
+            run(client, f"/article/feed?cursor={feed['next_cursor']}")
+            groups["feed"] = take()
+
+            run(client, "/article/genre/정치")
+            genre_feed = run(client, "/article/genre/정치/feed")
+            run(client, f"/article/genre/정치/feed?cursor={genre_feed['next_cursor']}")
+            groups["genre_feed"] = take()
+
+            run(client, f"/article/view/{article_id}")
+            groups["view"] = take()
+
+            run(client, f"/article/highlight/{article_id}")
+            groups["highlight"] = take()
+
+            run(client, f"/article/bias/{article_id}")
+            groups["bias"] = take()
+
+            run(client, "/article/keywords", "POST")
+            groups["keywords"] = take()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+        app.dependency_overrides.pop(get_db, None)
+        response_cache.clear()
+
+    return groups
+
+
+def _nodes(plan: dict) -> list:
+    nodes = [plan]
+    for child in plan.get("Plans", []):
+        nodes += _nodes(child)
+    return nodes
+
+
+def _seq_scans(plan: dict) -> list:
+    return [node.get("Relation Name") for node in _nodes(plan) if node["Node Type"] == "Seq Scan"]
+
+
+def _indexes(plan: dict) -> set:
+    return {node["Index Name"] for node in _nodes(plan) if "Index Name" in node}
+
+
+def explain(engine, statement: str, parameters) -> dict:
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        cursor.execute("SET enable_seqscan = off")
+        cursor.execute("EXPLAIN (FORMAT JSON) " + statement, parameters)
+        result = cursor.fetchone()[0]
+        return (json.loads(result) if isinstance(result, str) else result)[0]["Plan"]
+    finally:
+        raw.close()
+
+
+@pytest.mark.parametrize("group", ["feed", "genre_feed", "view", "highlight", "bias", "keywords"])
+def test_no_sequential_scan(engine, queries, group):
+    statements = queries[group]
+    assert statements, f"no SELECT captured for {group}"
+
+    for statement, parameters in statements:
+        scans = _seq_scans(explain(engine, statement, parameters))
+        assert not scans, f"Seq Scan on {scans} in {group} query:\n{statement}"
+
+
+
+# With seqscan off a full scan of the primary key avoids Seq Scan too, so the
+# ranked feeds and the keyword window must also walk the index they rely on
+@pytest.mark.parametrize("group,marker,index", [
+    ("feed", "ORDER BY articles.activity_score DESC", "ix_articles_activity_score_id"),
+    ("genre_feed", "ORDER BY articles.activity_score DESC", "ix_articles_genre_activity_score_id"),
+    ("keywords", "articles.published_at >=", "ix_articles_published_at"),
+])
+def test_uses_index(engine, queries, group, marker, index):
+    statements = [(statement, parameters) for statement, parameters in queries[group] if marker in statement]
+    assert statements, f"no {marker!r} query captured for {group}"
+
+    for statement, parameters in statements:
+        assert index in _indexes(explain(engine, statement, parameters)), f"{index} unused in {group} query:\n{statement}"